@@ -17,3 +17,93 @@ class JobRecord(SQLModel, table=True):
     status: str = 'discovered'  # discovered|shortlisted|packet_ready|submitted_user_confirmed|rejected
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PacketJobRecord(SQLModel, table=True):
+    """Queued application-packet generation (see backend.services.packet_jobs)."""
+    id: str = Field(primary_key=True)
+    status: str = Field(default='queued', index=True)  # queued|running|done|failed|cancelled
+    provider: str
+    job_title: str
+    company: str
+    job_description: str
+    country: str | None = None
+    ref: str | None = None  # caller's id for the job (e.g. tracker id)
+    # Kept so a queued job can still run after a restart.
+    profile_text: str
+    no_cache: bool = False
+    refresh: bool = False
+
+    markdown: str | None = None
+    dropped: str | None = None  # JSON list of what was trimmed to fit the context window
+    error: str | None = None
+    attempts: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+class ProfileRecord(SQLModel, table=True):
+    """Parsed candidate profile (see backend.services.profiles)."""
+    id: str = Field(primary_key=True)
+    cv_key: str = Field(index=True, unique=True)  # cv_cache key of the uploaded CV (content hash, file type, limits)
+    text: str  # compacted CV text, used for packets
+    data: str  # JSON of backend.app.schemas.profile.Profile
+    source: str = 'rules'  # rules|llm
+    provider: str | None = None
+    error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class CrawlTarget(SQLModel, table=True):
+    """A watched job board and its crawl state (see backend.services.crawler)."""
+    id: str = Field(primary_key=True)  # '<source>:<board>'
+    source: str
+    board: str
+    enabled: bool = True
+    # Scheduling, in epoch seconds; the interval adapts to how often the board changes.
+    interval_seconds: float
+    next_due_at: float = Field(default=0.0, index=True)
+    last_crawled_at: float | None = None
+    last_changed_at: float | None = None
+    digest: str | None = None  # hash of the normalized postings at the last crawl
+    job_count: int = 0
+    crawls: int = 0
+    changes: int = 0
+    failures: int = 0  # consecutive
+    last_error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PostingRecord(SQLModel, table=True):
+    """A job posting seen on a board, kept in sync by backend.services.postings."""
+    id: str = Field(primary_key=True)  # '<source>:<board>:<posting id>'
+    source: str = Field(index=True)
+    board: str = Field(index=True)
+    posting_id: str
+    title: str
+    company: str
+    location: str | None = None
+    country: str | None = None
+    remote: bool | None = None
+    url: str
+    posted_at: str | None = None
+    description: str | None = None
+    compensation: str | None = None
+    content_hash: str  # of the listing as the ATS gave it; a change triggers re-enrichment
+    enriched_hash: str | None = None  # content_hash the description/score belong to
+    score: int | None = None
+    status: str = Field(default='active', index=True)  # active|removed
+    missed: int = 0  # consecutive syncs the posting was absent from
+    first_seen_at: datetime = Field(default_factory=datetime.utcnow)
+    last_seen_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PostingChange(SQLModel, table=True):
+    """Change feed entry; consumers page through it by ``seq``."""
+    seq: int | None = Field(default=None, primary_key=True)
+    posting_key: str = Field(index=True)
+    source: str
+    board: str
+    kind: str  # new|changed|removed
+    title: str
+    company: str
+    url: str
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -10,4 +10,6 @@ class JobPosting(BaseModel):
     description: str | None = None
     source: str | None = None
     posted_at: str | None = None
-    country: str | None = None
+    country: str | None = None  # ISO code of the primary location
+    countries: list[str] = []  # every country the location names
+    compensation: str | None = None
@@ -0,0 +1,44 @@
+"""Request body size limit, enforced while the body is received.
+
+Starlette spools a whole multipart upload before the endpoint runs, so a
+check in the endpoint comes too late to protect memory or disk. This
+middleware rejects a request whose ``Content-Length`` is over the limit
+up front, and stops a chunked upload as soon as it passes the limit.
+"""
+from __future__ import annotations
+
+from fastapi import HTTPException
+from starlette.responses import PlainTextResponse
+
+
+class BodySizeLimitMiddleware:
+    def __init__(self, app, max_bytes):
+        self.app = app
+        # A callable so a changed setting takes effect without a restart.
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes()
+        length = dict(scope['headers']).get(b'content-length')
+        if length is not None and length.isdigit() and int(length) > limit:
+            response = PlainTextResponse(f"Request body larger than {limit} bytes", status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    # Raised inside body parsing, so FastAPI turns it into the response.
+                    raise HTTPException(status_code=413, detail=f"Request body larger than {limit} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,106 @@
+"""Per-provider circuit breaker.
+
+closed    -> calls pass; consecutive failures are counted.
+open      -> calls fail immediately with CircuitOpenError until the
+             cool-down has elapsed.
+half_open -> a limited number of probe calls pass; a success closes the
+             circuit, a failure re-opens it.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        half_open_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = lambda exc: True,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.half_open_calls = half_open_calls
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.trips = 0
+        self._probes = 0
+
+    def _before_call(self) -> None:
+        if self.state == OPEN:
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open; retry in {remaining:.0f}s")
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is half-open; probe already in flight")
+            self._probes += 1
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._probes = 0
+
+    def record_failure(self, exc: BaseException) -> None:
+        if not self.is_failure(exc):
+            # Caller-side errors (bad config, 4xx) say nothing about upstream health.
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Wrap one provider call; raises CircuitOpenError when not allowed."""
+        self._before_call()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+            raise
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        else:
+            self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == OPEN:
+            retry_in = max(0.0, self.opened_at + self.cooldown - time.monotonic())
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'trips': self.trips,
+            'rejected': self.rejected,
+            'retry_in_seconds': round(retry_in, 1),
+        }
@@ -125,5 +125,8 @@ def get_settings() -> AppSettings:
     return _settings
 
 
-# Legacy compatibility
-settings = get_settings()
+def __getattr__(name: str):
+    # Legacy ``config.settings``, built on first access rather than at import.
+    if name == 'settings':
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import time
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlmodel import SQLModel, Session, create_engine
+from backend.core.metrics import DB_QUERY_SECONDS
 from backend.core.settings import settings
 
 def get_database_url() -> str:
@@ -8,10 +14,30 @@ def get_database_url() -> str:
         return settings.DATABASE_URL
     return f"sqlite:///{settings.DATA_DIR / 'jobcraft.sqlite'}"
 
-engine = create_engine(get_database_url(), echo=False)
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+    DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation)
+
+def _query_failed(ctx):
+    stack = ctx.connection.info.get('query_started') if ctx.connection is not None else None
+    if stack:
+        stack.pop()
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """The shared engine, created on first use rather than at import."""
+    engine = create_engine(get_database_url(), echo=False)
+    event.listen(engine, 'before_cursor_execute', _query_started)
+    event.listen(engine, 'after_cursor_execute', _query_finished)
+    event.listen(engine, 'handle_error', _query_failed)
+    return engine
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(get_engine())
 
 def session():
-    return Session(engine)
+    return Session(get_engine())
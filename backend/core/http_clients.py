@@ -0,0 +1,89 @@
+"""Shared, pooled HTTP clients for LLM providers.
+
+Each provider gets one long-lived ``httpx.AsyncClient`` so TCP/TLS
+connections are reused across calls instead of being re-established for
+every packet. Clients are opened on app startup and closed on shutdown;
+``get()`` also creates them lazily so scripts and workers keep working.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import httpx
+
+from backend.core.settings import settings
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientPool:
+    """Registry of one pooled ``httpx.AsyncClient`` per provider name."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._requests: Dict[str, int] = {}
+        self._http2: Dict[str, bool] = {}
+
+    def _build(self, name: str, timeout: float) -> httpx.AsyncClient:
+        http2 = settings.LLM_HTTP2
+        if http2 and not _http2_available():
+            print("Warning: LLM_HTTP2 is enabled but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+        self._http2[name] = http2
+
+        limits = httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        )
+
+        async def _count(request: httpx.Request) -> None:
+            self._requests[name] = self._requests.get(name, 0) + 1
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=settings.LLM_HTTP_CONNECT_TIMEOUT),
+            limits=limits,
+            http2=http2,
+            event_hooks={'request': [_count]},
+        )
+
+    def get(self, name: str, timeout: float = 90) -> httpx.AsyncClient:
+        """Return the shared client for ``name``, creating it on first use."""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build(name, timeout)
+            self._clients[name] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every client and drop its pooled connections."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Pool usage per provider: open/idle connections and request count."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, client in self._clients.items():
+            # httpcore exposes the live connection list on the transport pool.
+            pool = getattr(getattr(client, '_transport', None), '_pool', None)
+            conns = list(getattr(pool, 'connections', []) or [])
+            idle = sum(1 for c in conns if c.is_idle())
+            out[name] = {
+                'connections': len(conns),
+                'idle': idle,
+                'active': len(conns) - idle,
+                'http2': self._http2.get(name, False),
+                'requests': self._requests.get(name, 0),
+                'closed': client.is_closed,
+            }
+        return out
+
+
+llm_clients = HTTPClientPool()
@@ -0,0 +1,140 @@
+"""Persistent, content-addressed cache for LLM responses.
+
+Entries are keyed by a SHA-256 of (provider, model, system, prefix, user,
+params) and stored in a small SQLite file under ``DATA_DIR``. Expired
+entries are dropped on read; when the cache grows past
+``LLM_CACHE_MAX_BYTES`` the least recently used entries are evicted.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.core.settings import settings
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    system: str,
+    user: str,
+    params: Optional[dict] = None,
+    prefix: str = '',
+) -> str:
+    fields = {'provider': provider, 'model': model, 'system': system, 'user': user, 'params': params or {}}
+    if prefix:
+        fields['prefix'] = prefix
+    blob = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL and size-based LRU eviction."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self._path or settings.DATA_DIR / 'llm_cache.sqlite'
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                ' key TEXT PRIMARY KEY,'
+                ' provider TEXT NOT NULL,'
+                ' model TEXT NOT NULL,'
+                ' response TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed ON llm_cache (accessed_at)')
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute('SELECT response, created_at FROM llm_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if now - created_at > settings.LLM_CACHE_TTL_SECONDS:
+                db.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                db.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            db.execute('UPDATE llm_cache SET accessed_at = ? WHERE key = ?', (now, key))
+            db.commit()
+            self.hits += 1
+            return response
+
+    def put(self, key: str, provider: str, model: str, response: str) -> None:
+        if not response:
+            return
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            db = self._db()
+            db.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, provider, model, response, size, created_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, provider, model, response, size, now, now),
+            )
+            self.writes += 1
+            self._evict(db, now)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        cur = db.execute('DELETE FROM llm_cache WHERE created_at < ?', (now - settings.LLM_CACHE_TTL_SECONDS,))
+        self.evictions += cur.rowcount
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        if total <= settings.LLM_CACHE_MAX_BYTES:
+            return
+        for key, size in db.execute('SELECT key, size FROM llm_cache ORDER BY accessed_at ASC').fetchall():
+            if total <= settings.LLM_CACHE_MAX_BYTES:
+                break
+            db.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute('DELETE FROM llm_cache')
+            db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'enabled': settings.LLM_CACHE_ENABLED,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': settings.LLM_CACHE_MAX_BYTES,
+            'ttl_seconds': settings.LLM_CACHE_TTL_SECONDS,
+        }
+
+
+llm_cache = LLMCache()
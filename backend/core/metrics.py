@@ -0,0 +1,235 @@
+"""Minimal Prometheus-style metrics (text exposition format 0.0.4).
+
+Counters, gauges and histograms keyed by label values, rendered by
+``GET /metrics``. Updates are a dict lookup and a few additions under a
+lock, so hooks can sit on hot paths. No external dependency.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: '_Metric') -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return ''.join(m.render() for m in self._metrics)
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _labels(self, values: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + '}'
+
+    def _header(self) -> str:
+        return f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> str:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + ''.join(f"{self.name}{self._labels(k)} {_fmt(v)}\n" for k, v in items)
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    @contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        """Count the block as in flight while it runs."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = (), registry: Optional[Registry] = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [per-bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: str, errors: Optional[Counter] = None) -> Iterator[None]:
+        """Observe the block's wall time; count it in ``errors`` if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if errors is not None:
+                errors.inc(*labels)
+            raise
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> str:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        out = [self._header()]
+        for labels, row in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                out.append(f"{self.name}_bucket{self._labels(labels, [('le', _fmt(bound))])} {_fmt(cumulative)}\n")
+            out.append(f"{self.name}_sum{self._labels(labels)} {_fmt(row[-2])}\n")
+            out.append(f"{self.name}_count{self._labels(labels)} {_fmt(row[-1])}\n")
+        return ''.join(out)
+
+
+_HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+_LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+_FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'jobcraft_http_request_duration_seconds', 'HTTP request latency by route (streams: until the last byte).',
+    ('method', 'route', 'status'), _HTTP_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge('jobcraft_http_requests_in_flight', 'HTTP requests currently being served.')
+
+LLM_REQUEST_SECONDS = Histogram(
+    'jobcraft_llm_request_duration_seconds', 'LLM provider call latency, including limiter waits and retries.',
+    ('provider', 'model', 'outcome'), _LLM_BUCKETS,
+)
+LLM_ERRORS = Counter('jobcraft_llm_errors_total', 'Failed LLM provider calls by error kind.', ('provider', 'model', 'kind'))
+LLM_RETRIES = Counter('jobcraft_llm_retries_total', 'LLM call retries (transient errors and 429s).', ('provider', 'model', 'reason'))
+LLM_IN_FLIGHT = Gauge('jobcraft_llm_requests_in_flight', 'LLM provider calls in flight, queued ones included.', ('provider',))
+
+CONNECTOR_FETCH_SECONDS = Histogram(
+    'jobcraft_connector_fetch_duration_seconds',
+    'ATS connector fetch latency by source and cache result (fresh and stale are cache hits).',
+    ('source', 'result'), _FETCH_BUCKETS,
+)
+CONNECTOR_ERRORS = Counter('jobcraft_connector_errors_total', 'Failed ATS connector fetches by source.', ('source',))
+CONNECTOR_CACHE_RESULTS = Counter(
+    'jobcraft_connector_cache_total',
+    'Connector HTTP cache outcomes (fresh, stale, not_modified, unchanged, changed, miss).',
+    ('result',),
+)
+
+CV_PARSE_SECONDS = Histogram(
+    'jobcraft_cv_parse_duration_seconds', 'CV text extraction time by file type.',
+    ('filetype',), (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+CV_PARSE_IN_FLIGHT = Gauge('jobcraft_cv_parses_in_flight', 'CV extractions currently running.')
+CV_PARSE_QUEUED = Gauge('jobcraft_cv_parses_queued', 'CV extractions waiting for a parse worker.')
+CV_PARSE_FAILURES = Counter('jobcraft_cv_parse_failures_total', 'Rejected or failed CV extractions by reason.', ('filetype', 'reason'))
+CV_POOL_RESTARTS = Counter('jobcraft_cv_pool_restarts_total', 'CV parse pool restarts after a worker timed out.')
+
+DB_QUERY_SECONDS = Histogram(
+    'jobcraft_db_query_duration_seconds', 'Database statement time by statement type.',
+    ('operation',), _DB_BUCKETS,
+)
+
+
+def _route_label(scope) -> str:
+    # Recent FastAPI keeps the included router's route (without its prefix)
+    # in scope['route'] and the prefixed template in the effective context.
+    effective = (scope.get('fastapi') or {}).get('effective_route_context')
+    path = getattr(effective, 'path_format', None) or getattr(scope.get('route'), 'path', None)
+    return path or 'unmatched'
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests.
+
+    The route label is the matched path template (``/api/tracker/jobs/{job_id}``),
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, scope['method'], _route_label(scope), str(status))
@@ -1,15 +1,25 @@
 """
 Model catalog for listing available models from each provider.
+
+Results are cached per provider. A fresh entry is returned as is; a stale
+one is returned immediately while a background refresh runs
+(stale-while-revalidate). Concurrent lookups share one upstream fetch.
+SettingsManager invalidates a provider's entry when its credentials or
+base URL change.
 """
 from __future__ import annotations
 
+import asyncio
 import os
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Tuple, Optional, Dict, Any
 
 import httpx
 
 from .config import AppSettings, LLMProvider, get_settings
+from .settings import settings as runtime_settings
 
 
 # Watsonx public endpoints
@@ -134,25 +144,28 @@ async def _list_gemini_models(settings: AppSettings) -> Tuple[List[str], Optiona
     return models, None
 
 
+async def _list_watsonx_region(client: httpx.AsyncClient, base: str) -> List[str]:
+    resp = await client.get(f"{base}{WATSONX_ENDPOINT}", params=WATSONX_PARAMS)
+    resp.raise_for_status()
+    return [
+        m["model_id"]
+        for m in resp.json().get("resources", [])
+        if m.get("model_id") and not _is_deprecated_or_withdrawn(m.get("lifecycle", []))
+    ]
+
+
 async def _list_watsonx_models(settings: AppSettings) -> Tuple[List[str], Optional[str]]:
-    """List Watsonx models from public foundation model specs."""
-    all_models = set()
+    """List Watsonx models from public foundation model specs (all regions at once)."""
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        results = await asyncio.gather(
+            *(_list_watsonx_region(client, base) for base in WATSONX_BASE_URLS),
+            return_exceptions=True,
+        )
 
-    for base in WATSONX_BASE_URLS:
-        url = f"{base}{WATSONX_ENDPOINT}"
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(url, params=WATSONX_PARAMS)
-                resp.raise_for_status()
-                resources = resp.json().get("resources", [])
-                for m in resources:
-                    if _is_deprecated_or_withdrawn(m.get("lifecycle", [])):
-                        continue
-                    model_id = m.get("model_id")
-                    if model_id:
-                        all_models.add(model_id)
-        except Exception:
-            continue
+    all_models = set()
+    for result in results:
+        if not isinstance(result, BaseException):
+            all_models.update(result)
 
     if not all_models:
         return [], "No Watsonx models found"
@@ -160,20 +173,7 @@ async def _list_watsonx_models(settings: AppSettings) -> Tuple[List[str], Option
     return sorted(all_models), None
 
 
-async def list_models_for_provider(
-    provider: LLMProvider,
-    settings: Optional[AppSettings] = None
-) -> Tuple[List[str], Optional[str]]:
-    """
-    List available models for a provider.
-
-    Returns:
-        (models, error) tuple where models is a list of model IDs
-        and error is None if successful, otherwise an error message.
-    """
-    if settings is None:
-        settings = get_settings()
-
+async def _fetch_models(provider: LLMProvider, settings: AppSettings) -> Tuple[List[str], Optional[str]]:
     if provider == LLMProvider.ollabridge:
         return await _list_ollabridge_models(settings)
     elif provider == LLMProvider.ollama:
@@ -188,3 +188,86 @@ async def list_models_for_provider(
         return await _list_watsonx_models(settings)
     else:
         return [], f"Unsupported provider: {provider}"
+
+
+@dataclass
+class _CatalogEntry:
+    models: List[str]
+    error: Optional[str]
+    fetched_at: float
+
+
+_catalog: Dict[LLMProvider, _CatalogEntry] = {}
+_refreshing: Dict[LLMProvider, "asyncio.Task[Tuple[List[str], Optional[str]]]"] = {}
+# Bumped on invalidation so a fetch started with old credentials is not stored.
+_generation: Dict[LLMProvider, int] = {}
+
+
+async def _fetch_and_store(provider: LLMProvider, settings: AppSettings) -> Tuple[List[str], Optional[str]]:
+    generation = _generation.get(provider, 0)
+    models, error = await _fetch_models(provider, settings)
+    if _generation.get(provider, 0) == generation:
+        _catalog[provider] = _CatalogEntry(models, error, time.monotonic())
+    return models, error
+
+
+def _refresh(provider: LLMProvider, settings: AppSettings) -> "asyncio.Task[Tuple[List[str], Optional[str]]]":
+    """Start (or join) the fetch for ``provider``."""
+    task = _refreshing.get(provider)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_store(provider, settings))
+        _refreshing[provider] = task
+
+        def _done(t: asyncio.Task) -> None:
+            if _refreshing.get(provider) is t:
+                del _refreshing[provider]
+            if not t.cancelled():
+                t.exception()  # a failed background refresh is not an unhandled error
+
+        task.add_done_callback(_done)
+    return task
+
+
+def invalidate_models(provider: Optional[LLMProvider] = None) -> None:
+    """Forget cached models for ``provider`` (or all providers)."""
+    for p in [provider] if provider else list(LLMProvider):
+        _generation[p] = _generation.get(p, 0) + 1
+        _catalog.pop(p, None)
+        _refreshing.pop(p, None)
+
+
+async def list_models_for_provider(
+    provider: LLMProvider,
+    settings: Optional[AppSettings] = None,
+    refresh: bool = False,
+) -> Tuple[List[str], Optional[str]]:
+    """
+    List available models for a provider.
+
+    Served from the catalog cache: fresh for MODEL_CATALOG_TTL_SECONDS,
+    then served stale for up to MODEL_CATALOG_STALE_SECONDS more while it
+    is refreshed in the background. Failed lookups are cached for
+    MODEL_CATALOG_ERROR_TTL_SECONDS and never served stale. ``refresh``
+    skips the cache (e.g. for a connection test).
+
+    Returns:
+        (models, error) tuple where models is a list of model IDs
+        and error is None if successful, otherwise an error message.
+    """
+    if settings is None:
+        settings = get_settings()
+
+    entry = _catalog.get(provider)
+    if entry is not None and not refresh:
+        age = time.monotonic() - entry.fetched_at
+        if entry.error:
+            if age < runtime_settings.MODEL_CATALOG_ERROR_TTL_SECONDS:
+                return entry.models, entry.error
+        elif age < runtime_settings.MODEL_CATALOG_TTL_SECONDS:
+            return entry.models, entry.error
+        elif age < runtime_settings.MODEL_CATALOG_TTL_SECONDS + runtime_settings.MODEL_CATALOG_STALE_SECONDS:
+            _refresh(provider, settings)
+            return entry.models, entry.error
+
+    # Shield the shared fetch so one caller going away does not cancel it for the rest.
+    return await asyncio.shield(_refresh(provider, settings))
@@ -0,0 +1,212 @@
+"""Per-provider concurrency limits and token-bucket rate limiting.
+
+Every provider gets a ``ProviderLimiter`` that combines:
+- a semaphore capping in-flight calls (a single Ollama box serves ~1),
+- request-per-minute and token-per-minute buckets for hosted quotas,
+- adaptive back-off on HTTP 429 using ``Retry-After`` and the vendor
+  rate-limit reset headers; the pause applies to all queued callers.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from backend.core.settings import settings
+
+T = TypeVar('T')
+
+
+def parse_limits(csv: str) -> Dict[str, float]:
+    """Parse ``'openai=8,ollama=1'`` into ``{'openai': 8.0, 'ollama': 1.0}``."""
+    out: Dict[str, float] = {}
+    for item in csv.split(','):
+        name, _, value = item.partition('=')
+        if name.strip() and value.strip():
+            out[name.strip().lower()] = float(value)
+    return out
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429
+
+
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def _seconds(value: str) -> Optional[float]:
+    """Seconds until a reset given as seconds, '6m0s', an HTTP date or RFC 3339."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if parts and ''.join(n + u for n, u in parts) == value:
+        return sum(float(n) * _UNITS[u] for n, u in parts)
+    for parse in (parsedate_to_datetime, lambda v: datetime.fromisoformat(v.replace('Z', '+00:00'))):
+        try:
+            when = parse(value)
+        except (TypeError, ValueError):
+            continue
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return (when - datetime.now(timezone.utc)).total_seconds()
+    return None
+
+
+def retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Best back-off hint from a 429 response, in seconds."""
+    if 'retry-after-ms' in headers:
+        try:
+            return float(headers['retry-after-ms']) / 1000
+        except ValueError:
+            pass
+    if 'retry-after' in headers:
+        hint = _seconds(headers['retry-after'])
+        if hint is not None:
+            return hint
+    # OpenAI: x-ratelimit-reset-requests/-tokens ('1s', '6m0s');
+    # Anthropic: anthropic-ratelimit-requests-reset/-tokens-reset (RFC 3339).
+    hints = [
+        _seconds(v) for k, v in headers.items()
+        if k.startswith('x-ratelimit-reset-') or (k.startswith('anthropic-ratelimit-') and k.endswith('-reset'))
+    ]
+    hints = [h for h in hints if h is not None]
+    return max(hints) if hints else None
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: float = 1) -> None:
+        n = min(n, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                await asyncio.sleep((n - self._tokens) / self.rate)
+
+
+class ProviderLimiter:
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self._requests = TokenBucket(rpm / 60, rpm) if rpm else None
+        self._tokens = TokenBucket(tpm / 60, tpm) if tpm else None
+        self._blocked_until = 0.0
+        self.rpm = rpm
+        self.tpm = tpm
+        self.queued = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @classmethod
+    def from_settings(cls, name: str) -> 'ProviderLimiter':
+        return cls(
+            name,
+            max_in_flight=int(parse_limits(settings.LLM_MAX_IN_FLIGHT).get(name, settings.LLM_MAX_IN_FLIGHT_DEFAULT)),
+            rpm=parse_limits(settings.LLM_RPM_LIMITS).get(name),
+            tpm=parse_limits(settings.LLM_TPM_LIMITS).get(name),
+        )
+
+    async def _wait_for_budget(self, tokens: int) -> None:
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._requests:
+            await self._requests.acquire(1)
+        if self._tokens and tokens:
+            await self._tokens.acquire(tokens)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold one in-flight slot, waiting for concurrency and rate budget."""
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            await self._sem.acquire()
+            try:
+                await self._wait_for_budget(tokens)
+            except BaseException:
+                self._sem.release()
+                raise
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+    def backoff(self, exc: BaseException, attempt: int) -> bool:
+        """Record a 429 and pause the provider. Returns True if worth retrying."""
+        if not is_rate_limited(exc):
+            return False
+        self.throttled += 1
+        delay = retry_after(exc.response.headers)
+        if delay is None or delay <= 0:
+            delay = settings.LLM_RATE_LIMIT_BASE_BACKOFF * (2 ** attempt)
+        delay = min(delay, settings.LLM_RATE_LIMIT_MAX_BACKOFF)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        return attempt < settings.LLM_RATE_LIMIT_RETRIES
+
+    async def run(self, fn: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        attempt = 0
+        while True:
+            async with self.slot(tokens):
+                try:
+                    return await fn()
+                except httpx.HTTPStatusError as e:
+                    if not self.backoff(e, attempt):
+                        raise
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_in_flight': self.max_in_flight,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'rpm': self.rpm,
+            'tpm': self.tpm,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'wait_seconds_total': round(self.wait_total, 3),
+            'wait_seconds_avg': round(self.wait_total / self.acquired, 3) if self.acquired else 0.0,
+            'wait_seconds_max': round(self.wait_max, 3),
+            'blocked_for_seconds': round(max(0.0, self._blocked_until - time.monotonic()), 3),
+        }
@@ -1,33 +1,349 @@
 from __future__ import annotations
-from typing import Dict
+from typing import AsyncIterator, Callable, Dict, Iterator, Mapping, Tuple
+import asyncio
+import importlib
+import time
 
+import httpx
+
+from backend.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from backend.core.llm_cache import cache_key, llm_cache
+from backend.core.metrics import LLM_ERRORS, LLM_IN_FLIGHT, LLM_REQUEST_SECONDS, LLM_RETRIES
+from backend.core.rate_limit import ProviderLimiter
+from backend.core.routing import ProviderHealth, fallback_chain, hedge_delay
 from backend.core.settings import settings
-from backend.providers.base import LLMProvider
-from backend.providers.ollabridge import OllaBridgeProvider
-from backend.providers.ollama import OllamaProvider
-from backend.providers.openai_provider import OpenAIProvider
-from backend.providers.anthropic import AnthropicProvider
-from backend.providers.gemini import GeminiProvider
-from backend.providers.watsonx import WatsonxProvider
+from backend.core.singleflight import SingleFlight
+from backend.core.token_budget import estimate_tokens
+from backend.providers.base import LLMProvider, ProviderConfigError, is_client_error
+
+# name -> 'module:Class'; imported and constructed on first use.
+PROVIDERS: Dict[str, str] = {
+    'ollabridge': 'backend.providers.ollabridge:OllaBridgeProvider',   # ✅ default
+    'ollama': 'backend.providers.ollama:OllamaProvider',               # optional
+    'openai': 'backend.providers.openai_provider:OpenAIProvider',
+    'anthropic': 'backend.providers.anthropic:AnthropicProvider',
+    'gemini': 'backend.providers.gemini:GeminiProvider',
+    'watsonx': 'backend.providers.watsonx:WatsonxProvider',
+}
+
+def _load(path: str) -> Callable[[], LLMProvider]:
+    module, _, cls = path.partition(':')
+    return getattr(importlib.import_module(module), cls)
+
+class LazyProviders(Mapping[str, LLMProvider]):
+    """Provider registry that builds each provider the first time it is looked up.
+
+    Iterating yields names only, so listing or routing over providers does
+    not construct them; ``loaded()`` returns the ones built so far.
+    """
+
+    def __init__(self, paths: Dict[str, str]):
+        self._paths = dict(paths)
+        self._instances: Dict[str, LLMProvider] = {}
+
+    def __getitem__(self, name: str) -> LLMProvider:
+        p = self._instances.get(name)
+        if p is None:
+            if name not in self._paths:
+                raise KeyError(name)
+            p = self._instances[name] = _load(self._paths[name])()
+        return p
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def loaded(self) -> Dict[str, LLMProvider]:
+        return dict(self._instances)
+
+def _error_kind(exc: BaseException) -> str:
+    """Low-cardinality label for a failed provider call."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code}"
+    if isinstance(exc, httpx.TimeoutException):
+        return 'timeout'
+    if isinstance(exc, ProviderConfigError):
+        return 'config'
+    return type(exc).__name__
+
+def _estimate_tokens(model: str, system: str, user: str, prefix: str = '') -> int:
+    return sum(estimate_tokens(part, model) for part in (system, prefix, user))
 
 class MultiLLMRouter:
     def __init__(self):
-        self.providers: Dict[str, LLMProvider] = {
-            'ollabridge': OllaBridgeProvider(),   # ✅ default
-            'ollama': OllamaProvider(),           # optional
-            'openai': OpenAIProvider(),
-            'anthropic': AnthropicProvider(),
-            'gemini': GeminiProvider(),
-            'watsonx': WatsonxProvider(),
+        self.providers = LazyProviders(PROVIDERS)
+        self.inflight = SingleFlight()
+        self.limiters: Dict[str, ProviderLimiter] = {
+            name: ProviderLimiter.from_settings(name) for name in self.providers
+        }
+        self.health: Dict[str, ProviderHealth] = {name: ProviderHealth() for name in self.providers}
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(
+                name,
+                failure_threshold=settings.LLM_BREAKER_FAILURES,
+                cooldown=settings.LLM_BREAKER_COOLDOWN,
+                half_open_calls=settings.LLM_BREAKER_HALF_OPEN_CALLS,
+                is_failure=lambda exc: not is_client_error(exc),
+            )
+            for name in self.providers
         }
+        self.fallbacks = 0
+        self.hedges = 0
 
     def list(self) -> list[str]:
         return sorted(self.providers.keys())
 
-    async def chat(self, provider: str | None, *, system: str, user: str) -> str:
+    def routing_stats(self) -> dict:
+        return {
+            'mode': settings.LLM_ROUTING_MODE,
+            'fallbacks': self.fallbacks,
+            'hedges': self.hedges,
+            'providers': {name: h.stats() for name, h in self.health.items()},
+        }
+
+    def usage_stats(self) -> dict:
+        """Upstream-reported token usage per provider, incl. cached prompt tokens."""
+        return {name: dict(p.usage) for name, p in self.providers.loaded().items()}
+
+    def open_clients(self) -> None:
+        """Build the providers requests will go to first and open their pooled
+        HTTP clients (app startup); the others are built on first use."""
+        names = [self._resolve(None)]
+        if settings.LLM_ROUTING_MODE == 'fallback':
+            names = fallback_chain(names[0], self.list(), self.health)
+        for name in names:
+            self.providers[name].client()
+
+    def _resolve(self, provider: str | None) -> str:
         name = (provider or settings.DEFAULT_PROVIDER).lower()
         if name not in self.providers:
             name = settings.DEFAULT_PROVIDER
-        return await self.providers[name].chat(system=system, user=user)
+        return name
+
+    def provider(self, provider: str | None) -> LLMProvider:
+        """The provider instance a request for ``provider`` would go to first."""
+        return self.providers[self._resolve(provider)]
+
+    def _cache_key(self, name: str, system: str, user: str, prefix: str, no_cache: bool) -> str | None:
+        if no_cache or not settings.LLM_CACHE_ENABLED:
+            return None
+        p = self.providers[name]
+        return cache_key(name, p.model, system, user, p.params, prefix)
+
+    async def _call_provider(self, name: str, system: str, user: str, prefix: str = '') -> str:
+        """One provider call through its breaker and limiter, recording latency/errors."""
+        p = self.providers[name]
+        model = p.model
+        health = self.health[name]
+        started = time.monotonic()
+        attempts = 0
+        outcome = 'error'
+
+        async def attempt() -> str:
+            nonlocal attempts
+            attempts += 1
+            return await p.chat(system=system, user=user, prefix=prefix)
+
+        LLM_IN_FLIGHT.inc(name)
+        try:
+            with self.breakers[name].guard():
+                text = await self.limiters[name].run(attempt, tokens=_estimate_tokens(model, system, user, prefix))
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        except CircuitOpenError:
+            # Rejected without an upstream call: the breaker counts it, health does not.
+            outcome = 'circuit_open'
+            raise
+        except Exception as e:
+            health.record_failure()
+            LLM_ERRORS.inc(name, model, _error_kind(e))
+            raise
+        else:
+            outcome = 'ok'
+            health.record_success(time.monotonic() - started)
+            return text
+        finally:
+            LLM_IN_FLIGHT.dec(name)
+            if attempts > 1:
+                LLM_RETRIES.inc(name, model, 'rate_limited', amount=attempts - 1)
+            LLM_REQUEST_SECONDS.observe(time.monotonic() - started, name, model, outcome)
+
+    async def _routed(self, name: str, system: str, user: str, prefix: str = '') -> Tuple[str, str]:
+        """Call ``name``; in fallback mode walk the chain and optionally hedge.
+        Returns the provider that answered and its reply.
+
+        With hedging on, if the current attempt runs past the provider's
+        LLM_HEDGE_PERCENTILE latency the next provider in the chain is
+        started too; the first success wins and the loser is cancelled.
+        """
+        if settings.LLM_ROUTING_MODE != 'fallback':
+            return name, await self._call_provider(name, system, user, prefix)
+
+        chain = iter(fallback_chain(name, self.list(), self.health))
+        running: Dict[asyncio.Task, str] = {}
+        errors: list[str] = []
+        hedged = False
+
+        def launch() -> str | None:
+            nxt = next(chain, None)
+            if nxt is not None:
+                running[asyncio.ensure_future(self._call_provider(nxt, system, user, prefix))] = nxt
+            return nxt
+
+        current = launch()
+        try:
+            while running:
+                delay = None if hedged else hedge_delay(self.health[current])
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if launch() is not None:
+                        self.hedges += 1
+                    continue
+                for task in done:
+                    failed = running.pop(task)
+                    if task.exception() is None:
+                        return failed, task.result()
+                    errors.append(f"{failed}: {task.exception()}")
+                if not running or hedged:
+                    # Replace the failed attempt; a surviving hedge keeps running.
+                    nxt = launch()
+                    if nxt is not None:
+                        self.fallbacks += 1
+                        if len(running) == 1:
+                            current, hedged = nxt, False
+            raise RuntimeError('All providers failed: ' + '; '.join(errors))
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def chat(
+        self,
+        provider: str | None,
+        *,
+        system: str,
+        user: str,
+        prefix: str = '',
+        no_cache: bool = False,
+        refresh: bool = False,
+    ) -> str:
+        """Route a chat call, serving repeats from the response cache.
+
+        ``prefix`` is stable context placed right after the system prompt so
+        providers can reuse a cached prompt prefix (see LLMProvider).
+        ``no_cache`` skips the cache entirely; ``refresh`` ignores any cached
+        reply but stores the new one. Concurrent identical calls are
+        coalesced into one provider request.
+        """
+        name = self._resolve(provider)
+        p = self.providers[name]
+        key = self._cache_key(name, system, user, prefix, no_cache)
+        if key and not refresh:
+            cached = await asyncio.to_thread(llm_cache.get, key)
+            if cached is not None:
+                return cached
+
+        async def call() -> str:
+            answered, text = await self._routed(name, system, user, prefix)
+            # A fallback reply is cached as that provider's, never as the primary's.
+            store = key if answered == name else self._cache_key(answered, system, user, prefix, no_cache)
+            if store:
+                await asyncio.to_thread(llm_cache.put, store, answered, self.providers[answered].model, text)
+            return text
+
+        if not settings.LLM_SINGLE_FLIGHT:
+            return await call()
+        # Identical concurrent requests share one upstream call.
+        flight_key = key or cache_key(name, p.model, system, user, p.params, prefix)
+        return await self.inflight.do(flight_key, call)
+
+    async def _stream_provider(self, name: str, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        p = self.providers[name]
+        model = p.model
+        limiter = self.limiters[name]
+        health = self.health[name]
+        started = time.monotonic()
+        emitted = False
+        attempt = 0
+        outcome = 'error'
+        LLM_IN_FLIGHT.inc(name)
+        try:
+            with self.breakers[name].guard():
+                while True:
+                    async with limiter.slot(_estimate_tokens(model, system, user, prefix)):
+                        try:
+                            async for chunk in p.chat_stream(system=system, user=user, prefix=prefix):
+                                emitted = True
+                                yield chunk
+                            break
+                        except httpx.HTTPStatusError as e:
+                            # A 429 arrives before any token, so a retry cannot duplicate output.
+                            if emitted or not limiter.backoff(e, attempt):
+                                raise
+                    attempt += 1
+                    LLM_RETRIES.inc(name, model, 'rate_limited')
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = 'cancelled'
+            raise
+        except CircuitOpenError:
+            outcome = 'circuit_open'
+            raise
+        except Exception as e:
+            health.record_failure()
+            LLM_ERRORS.inc(name, model, _error_kind(e))
+            raise
+        else:
+            outcome = 'ok'
+            health.record_success(time.monotonic() - started)
+        finally:
+            LLM_IN_FLIGHT.dec(name)
+            LLM_REQUEST_SECONDS.observe(time.monotonic() - started, name, model, outcome)
+
+    async def chat_stream(
+        self,
+        provider: str | None,
+        *,
+        system: str,
+        user: str,
+        prefix: str = '',
+        no_cache: bool = False,
+        refresh: bool = False,
+    ) -> AsyncIterator[str]:
+        name = self._resolve(provider)
+        key = self._cache_key(name, system, user, prefix, no_cache)
+        if key and not refresh:
+            cached = await asyncio.to_thread(llm_cache.get, key)
+            if cached is not None:
+                yield cached
+                return
+
+        if settings.LLM_ROUTING_MODE == 'fallback':
+            chain = fallback_chain(name, self.list(), self.health)
+        else:
+            chain = [name]
+        parts: list[str] = []
+        answered = name
+        for i, candidate in enumerate(chain):
+            try:
+                async for chunk in self._stream_provider(candidate, system, user, prefix):
+                    parts.append(chunk)
+                    yield chunk
+                answered = candidate
+                break
+            except Exception:
+                # Fall back only while nothing has reached the client yet.
+                if parts or i == len(chain) - 1:
+                    raise
+                self.fallbacks += 1
+        # Only complete generations are cached, under the provider that produced them.
+        store = key if answered == name else self._cache_key(answered, system, user, prefix, no_cache)
+        if store:
+            await asyncio.to_thread(llm_cache.put, store, answered, self.providers[answered].model, ''.join(parts))
 
 router = MultiLLMRouter()
@@ -0,0 +1,75 @@
+"""Latency and error tracking used for fallback routing and hedging."""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.core.settings import settings
+
+
+class ProviderHealth:
+    """EWMA latency/error rate plus a window of recent latencies per provider."""
+
+    def __init__(self, alpha: float = 0.2, window: int = 200):
+        self.alpha = alpha
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.successes = 0
+        self.failures = 0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record_success(self, seconds: float) -> None:
+        self.successes += 1
+        self._recent.append(seconds)
+        if self.latency_ewma is None:
+            self.latency_ewma = seconds
+        else:
+            self.latency_ewma += self.alpha * (seconds - self.latency_ewma)
+        self.error_ewma *= (1 - self.alpha)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.error_ewma += self.alpha * (1 - self.error_ewma)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        idx = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[idx]
+
+    @property
+    def samples(self) -> int:
+        return len(self._recent)
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            'latency_ewma': round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            'error_rate_ewma': round(self.error_ewma, 3),
+            'p50': round(p50, 3) if p50 is not None else None,
+            'p95': round(p95, 3) if p95 is not None else None,
+            'successes': self.successes,
+            'failures': self.failures,
+        }
+
+
+def fallback_chain(first: str, known: List[str], health: Dict[str, ProviderHealth]) -> List[str]:
+    """Requested provider first, then LLM_FALLBACK_CHAIN order.
+
+    Fallbacks whose recent error rate is above LLM_UNHEALTHY_ERROR_RATE
+    are moved to the back so a dead upstream is tried last, not next.
+    """
+    rest = [n.strip().lower() for n in settings.LLM_FALLBACK_CHAIN.split(',') if n.strip()]
+    rest = [n for n in dict.fromkeys(rest) if n in known and n != first]
+    healthy = [n for n in rest if health[n].error_ewma <= settings.LLM_UNHEALTHY_ERROR_RATE]
+    unhealthy = [n for n in rest if n not in healthy]
+    return [first] + healthy + unhealthy
+
+
+def hedge_delay(health: ProviderHealth) -> Optional[float]:
+    """Seconds to wait before sending a hedged request, or None to not hedge."""
+    if not settings.LLM_HEDGE or health.samples < settings.LLM_HEDGE_MIN_SAMPLES:
+        return None
+    p = health.percentile(settings.LLM_HEDGE_PERCENTILE)
+    return max(p or 0.0, settings.LLM_HEDGE_MIN_DELAY)
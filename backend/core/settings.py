@@ -27,6 +27,9 @@ class Settings(BaseSettings):
     OLLABRIDGE_BASE_URL: str | None = None
     OLLABRIDGE_API_KEY: str | None = None
     OLLABRIDGE_MODEL: str = 'deepseek-r1'
+    # Context window behind OllaBridge; its OpenAI-compatible endpoint cannot
+    # set num_ctx, so this is Ollama's default (4096; 2048 before Ollama 0.6)
+    OLLABRIDGE_NUM_CTX: int = 4096
 
     # OpenAI
     OPENAI_API_KEY: str | None = None
@@ -49,6 +52,140 @@ class Settings(BaseSettings):
     # Ollama (direct; optional fallback)
     OLLAMA_BASE_URL: str = 'http://localhost:11434'
     OLLAMA_MODEL: str = 'deepseek-r1'
+    # How long Ollama keeps the model (and its prompt KV cache) loaded
+    OLLAMA_KEEP_ALIVE: str = '30m'
+    # Context window (num_ctx) the local model runs with; used for prompt budgeting
+    OLLAMA_NUM_CTX: int = 8192
+    # Extra Ollama runtime options as JSON, e.g. {"num_thread": 8, "num_gpu": 99}
+    OLLAMA_OPTIONS: str = ''
+
+    # Local model warm-up: preload at startup / on provider or model change,
+    # then ping every LLM_KEEPALIVE_INTERVAL_SECONDS (0 = no periodic pings)
+    LLM_WARMUP_ENABLED: bool = True
+    LLM_KEEPALIVE_INTERVAL_SECONDS: float = 240.0
+    LLM_WARMUP_TIMEOUT_SECONDS: float = 120.0
+
+    # Gemini context caching (cachedContents) for long, repeated prompt prefixes
+    GEMINI_CACHE_MIN_CHARS: int = 16000
+    GEMINI_CACHE_TTL_SECONDS: int = 3600
+    GEMINI_CACHE_MAX_ENTRIES: int = 256
+
+    # LLM HTTP connection pool (one long-lived client per provider)
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE: int = 10
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP_CONNECT_TIMEOUT: float = 10.0
+    LLM_HTTP2: bool = False  # requires the optional 'h2' package
+
+    # LLM response cache (SQLite under DATA_DIR)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Coalesce identical in-flight LLM requests into one upstream call
+    LLM_SINGLE_FLIGHT: bool = True
+
+    # Per-provider limits, as 'provider=value' CSV (router provider names)
+    LLM_MAX_IN_FLIGHT: str = 'ollabridge=1,ollama=1'
+    LLM_MAX_IN_FLIGHT_DEFAULT: int = 8
+    LLM_RPM_LIMITS: str = ''   # e.g. 'openai=500,anthropic=50'
+    LLM_TPM_LIMITS: str = ''   # e.g. 'openai=200000,anthropic=40000'
+    LLM_RATE_LIMIT_RETRIES: int = 3
+    LLM_RATE_LIMIT_BASE_BACKOFF: float = 1.0
+    LLM_RATE_LIMIT_MAX_BACKOFF: float = 60.0
+
+    # Routing: 'single' (requested provider only) or 'fallback' (walk the chain)
+    LLM_ROUTING_MODE: str = 'single'
+    LLM_FALLBACK_CHAIN: str = 'ollabridge,ollama,openai'
+    LLM_UNHEALTHY_ERROR_RATE: float = 0.5
+    # Hedging: start the next provider when the current one is slower than
+    # its LLM_HEDGE_PERCENTILE latency (needs LLM_HEDGE_MIN_SAMPLES history)
+    LLM_HEDGE: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_DELAY: float = 2.0
+    LLM_HEDGE_MIN_SAMPLES: int = 10
+
+    # Circuit breaker: open after N consecutive upstream failures, then fail
+    # fast for LLM_BREAKER_COOLDOWN seconds before letting a probe through
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_COOLDOWN: float = 30.0
+    LLM_BREAKER_HALF_OPEN_CALLS: int = 1
+
+    # Batch packet generation (one CV, many jobs)
+    PACKET_BATCH_CONCURRENCY: int = 4
+    PACKET_BATCH_MAX_JOBS: int = 50
+
+    # Background packet jobs: worker count, restarts a job may survive,
+    # and how long finished jobs are kept
+    PACKET_JOB_WORKERS: int = 2
+    PACKET_JOB_MAX_ATTEMPTS: int = 3
+    PACKET_JOB_RETENTION_DAYS: int = 7
+
+    # Prompt token budgeting: context windows override the built-in table
+    # ('provider or model=tokens', comma separated); inputs are trimmed to
+    # fit window - reserved output tokens, the CV getting PACKET_CV_SHARE.
+    LLM_CONTEXT_WINDOWS: str = ''
+    LLM_DEFAULT_CONTEXT_WINDOW: int = 8192
+    LLM_RESERVED_OUTPUT_TOKENS: int = 2048
+    PACKET_CV_SHARE: float = 0.6
+
+    # Provider model catalog cache (served stale while refreshing in the background)
+    MODEL_CATALOG_TTL_SECONDS: int = 600
+    MODEL_CATALOG_STALE_SECONDS: int = 24 * 3600
+    MODEL_CATALOG_ERROR_TTL_SECONDS: int = 30
+
+    # CV parsing: PDF/DOCX extraction runs in a process pool (0 workers =
+    # min(4, CPUs)); uploads over the size/page limits are rejected
+    CV_PARSE_WORKERS: int = 0
+    CV_PARSE_TIMEOUT_SECONDS: float = 30.0
+    CV_PARSE_MAX_QUEUE: int = 32
+    CV_PARSE_MAX_TASKS_PER_CHILD: int = 50
+    CV_MAX_BYTES: int = 10 * 1024 * 1024
+    CV_MAX_PAGES: int = 30
+    # Extraction stops once this many characters are collected; request
+    # bodies (CV upload plus form fields) over MAX_REQUEST_BYTES are refused
+    CV_MAX_CHARS: int = 60_000
+    MAX_REQUEST_BYTES: int = 16 * 1024 * 1024
+
+    # Extracted CV text cache, keyed by the upload's SHA-256 (LRU by size)
+    CV_CACHE_ENABLED: bool = True
+    CV_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Job board discovery: shared connector client, overall and per-ATS-host
+    # concurrency for multi-board fetches
+    CONNECTOR_TIMEOUT_SECONDS: float = 30.0
+    DISCOVERY_CONCURRENCY: int = 16
+    DISCOVERY_PER_HOST: int = 4
+    DISCOVERY_MAX_TARGETS: int = 500
+
+    # Background crawler: watchlist seed ('source:board,...'), adaptive
+    # per-board intervals with jitter, concurrency and per-host politeness
+    CRAWLER_ENABLED: bool = True
+    CRAWLER_WATCHLIST: str = ''
+    CRAWLER_DEFAULT_INTERVAL_SECONDS: float = 3600.0
+    CRAWLER_MIN_INTERVAL_SECONDS: float = 900.0
+    CRAWLER_MAX_INTERVAL_SECONDS: float = 6 * 3600.0
+    CRAWLER_JITTER: float = 0.2
+    CRAWLER_CONCURRENCY: int = 4
+    CRAWLER_PER_HOST: int = 2
+    CRAWLER_HOST_MIN_INTERVAL_SECONDS: float = 1.0
+
+    # Connector HTTP cache: responses reused for the TTL, then served stale
+    # while revalidating (ETag / Last-Modified, persisted under DATA_DIR)
+    CONNECTOR_CACHE_ENABLED: bool = True
+    CONNECTOR_CACHE_TTL_SECONDS: float = 300.0
+    CONNECTOR_CACHE_STALE_SECONDS: float = 3600.0
+    CONNECTOR_CACHE_MEMORY_ENTRIES: int = 500
+    CONNECTOR_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Posting sync: boards fetched by discovery and the crawler are diffed
+    # into the postings table; only changed postings are re-described and
+    # re-scored (against POSTINGS_PROFILE_ID, or the latest stored profile)
+    POSTINGS_SYNC_ENABLED: bool = True
+    POSTINGS_PROFILE_ID: str | None = None
+    POSTINGS_DESCRIPTION_CONCURRENCY: int = 4
+    POSTINGS_CHANGE_RETENTION_DAYS: int = 90
+    # Consecutive non-empty listings a posting must be missing from to count as removed
+    POSTINGS_REMOVE_AFTER_MISSES: int = 2
 
     # Database
     # SQLite default under DATA_DIR
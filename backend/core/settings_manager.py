@@ -11,6 +11,11 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 from backend.core.config import AppSettings, LLMProvider, get_settings
+from backend.core.model_catalog import invalidate_models
+from backend.core.warmup import LOCAL_PROVIDERS, model_warmer
+
+# Settings that change which models a provider lists.
+CATALOG_KEYS = ("api_key", "base_url", "project_id")
 
 
 class SettingsManager:
@@ -59,8 +64,11 @@ class SettingsManager:
         except ValueError:
             raise ValueError(f"Invalid provider: {provider_id}")
 
+        changed = provider_id != self.get_active_provider()
         self._runtime_config["active_provider"] = provider_id
         self._save()
+        if changed and provider_id in LOCAL_PROVIDERS:
+            model_warmer.trigger()
 
     def get_provider_config(self, provider_id: str) -> Dict[str, Any]:
         """Get configuration for a specific provider."""
@@ -92,10 +100,19 @@ class SettingsManager:
         # Filter out None/empty values
         filtered_config = {k: v for k, v in config.items() if v}
 
+        previous = self.get_provider_config(provider_id)
+
         # Update runtime config
         self._runtime_config["providers"][provider_id] = filtered_config
         self._save()
 
+        current = self.get_provider_config(provider_id)
+        if any(previous.get(k) != current.get(k) for k in CATALOG_KEYS):
+            invalidate_models(LLMProvider(provider_id))
+        if provider_id in LOCAL_PROVIDERS and previous != current:
+            # New local model or server: load it before the next request needs it.
+            model_warmer.trigger()
+
         return self.get_provider_config(provider_id)
 
     def _get_defaults_for_provider(self, provider_id: str) -> Dict[str, Any]:
@@ -0,0 +1,67 @@
+"""In-process coalescing of identical concurrent calls ("single-flight").
+
+The first caller for a key starts the work as a task; callers arriving
+while it runs await the same task. Each waiter is shielded, so one
+waiter being cancelled (e.g. a client disconnect) does not cancel the
+call for the others. The upstream task is only cancelled once every
+waiter has gone away.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar('T')
+
+
+class _Call:
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda t, k=key, c=call: self._forget(k, c))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters <= 0 and not call.task.done():
+                # Last interested caller left: stop the upstream call, and
+                # forget it now so a caller arriving before the task has
+                # finished cancelling starts a fresh call instead of joining it.
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # Mark the exception as retrieved even if every waiter was cancelled.
+            call.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'in_flight': len(self._calls),
+            'waiters': sum(c.waiters for c in self._calls.values()),
+            'calls': self.calls,
+            'coalesced': self.shared,
+        }
@@ -0,0 +1,16 @@
+"""Server-sent events helpers shared by streaming endpoints."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Sent with every SSE response; X-Accel-Buffering stops nginx from
+# buffering the stream until the generation finishes.
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no',
+}
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one SSE frame with a JSON-encoded ``data`` line."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
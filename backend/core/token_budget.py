@@ -0,0 +1,225 @@
+"""Token estimation and context-window budgeting for prompts.
+
+The estimator is deliberately dependency-free: it counts word and
+punctuation pieces with one regex and scales by a per-model-family factor
+calibrated against the BPE tokenizers those families use. It is meant for
+budgeting (within ~10-15%), not billing.
+"""
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from backend.core.rate_limit import parse_limits
+from backend.core.settings import settings
+
+_PIECES = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_BLANKS = re.compile(r"[ \t\f\v]+")
+_MANY_NEWLINES = re.compile(r"\n{3,}")
+
+# (model substring, tokens per word/punctuation piece)
+_TOKEN_FACTORS: Tuple[Tuple[str, float], ...] = (
+    ('gpt-4o', 1.05),
+    ('gpt-4', 1.1),
+    ('gpt-3.5', 1.1),
+    ('claude', 1.15),
+    ('gemini', 1.05),
+    ('granite', 1.25),
+    ('llama', 1.2),
+    ('deepseek', 1.2),
+    ('mistral', 1.25),
+    ('qwen', 1.15),
+)
+_DEFAULT_FACTOR = 1.2
+
+# (model substring, context window in tokens); first match wins.
+_CONTEXT_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ('gpt-4.1', 1_000_000),
+    ('gpt-4o', 128_000),
+    ('gpt-4-turbo', 128_000),
+    ('gpt-4', 8_192),
+    ('gpt-3.5', 16_385),
+    ('claude', 200_000),
+    ('gemini-1.5', 1_000_000),
+    ('gemini-2', 1_000_000),
+    ('gemini-1.0', 32_760),
+    ('granite', 8_192),
+)
+
+
+def _factor(model: str) -> float:
+    m = (model or '').lower()
+    for needle, factor in _TOKEN_FACTORS:
+        if needle in m:
+            return factor
+    return _DEFAULT_FACTOR
+
+
+def estimate_tokens(text: str, model: str = '') -> int:
+    """Fast token estimate for ``text`` under ``model``'s tokenizer family."""
+    if not text:
+        return 0
+    return math.ceil(len(_PIECES.findall(text)) * _factor(model))
+
+
+def context_window(provider: str, model: str) -> int:
+    """Context window for a provider/model.
+
+    LLM_CONTEXT_WINDOWS overrides (by model, then provider) win; Ollama
+    uses OLLAMA_NUM_CTX, which it is sent, and OllaBridge
+    OLLABRIDGE_NUM_CTX, since its OpenAI-compatible endpoint cannot pass
+    num_ctx and the model runs with Ollama's default; otherwise the
+    built-in table.
+    """
+    overrides = parse_limits(settings.LLM_CONTEXT_WINDOWS)
+    for key in ((model or '').lower(), provider):
+        if key in overrides:
+            return int(overrides[key])
+    if provider == 'ollama':
+        return settings.OLLAMA_NUM_CTX
+    if provider == 'ollabridge':
+        return settings.OLLABRIDGE_NUM_CTX
+    m = (model or '').lower()
+    for needle, window in _CONTEXT_WINDOWS:
+        if needle in m:
+            return window
+    return settings.LLM_DEFAULT_CONTEXT_WINDOW
+
+
+def compact(text: str) -> str:
+    """Collapse runs of spaces and blank lines (PDF extraction is full of them)."""
+    text = _BLANKS.sub(' ', text or '')
+    text = '\n'.join(line.strip() for line in text.splitlines())
+    return _MANY_NEWLINES.sub('\n\n', text).strip()
+
+
+@dataclass
+class Section:
+    title: str
+    text: str
+    priority: int  # higher is kept longer
+
+
+def _is_heading(line: str, keywords: Iterable[str]) -> Optional[str]:
+    """Return the matched keyword if ``line`` looks like a section heading."""
+    bare = line.strip().strip(':#*-–— ').lower()
+    if not bare or len(bare) > 40:
+        return None
+    for kw in keywords:
+        if bare == kw or bare.startswith(kw + ' ') or bare.endswith(' ' + kw):
+            return kw
+    return None
+
+
+def split_sections(text: str, priorities: dict, default: int) -> List[Section]:
+    """Split text at recognised headings; unrecognised text keeps ``default``."""
+    sections: List[Section] = [Section('intro', '', default)]
+    for line in text.splitlines():
+        kw = _is_heading(line, priorities)
+        if kw:
+            sections.append(Section(kw, line + '\n', priorities[kw]))
+        else:
+            sections[-1].text += line + '\n'
+    return [s for s in sections if s.text.strip()]
+
+
+# CV: skills and experience matter most, hobbies and references least.
+CV_PRIORITIES = {
+    'skills': 10, 'technical skills': 10, 'core competencies': 10, 'competencies': 10,
+    'experience': 9, 'work experience': 9, 'professional experience': 9, 'employment': 9,
+    'employment history': 9, 'summary': 8, 'profile': 8, 'professional summary': 8,
+    'projects': 7, 'education': 6, 'certifications': 6, 'certificates': 6, 'languages': 5,
+    'publications': 4, 'awards': 4, 'volunteering': 3, 'volunteer': 3,
+    'interests': 1, 'hobbies': 1, 'references': 0,
+}
+# Job description: requirements over the company blurb and legal boilerplate.
+JD_PRIORITIES = {
+    'requirements': 10, 'qualifications': 10, 'what you bring': 10, "what you'll bring": 10,
+    'must have': 10, 'nice to have': 8, 'preferred qualifications': 8,
+    'responsibilities': 9, "what you'll do": 9, 'what you will do': 9, 'the role': 9, 'role': 9,
+    'about the role': 9, 'tech stack': 8, 'benefits': 3, 'perks': 3, 'what we offer': 3,
+    'about us': 2, 'about the company': 2, 'who we are': 2, 'our mission': 2,
+    'equal opportunity': 0, 'diversity': 0, 'privacy': 0, 'eeo': 0,
+}
+
+
+# Sections at or above this priority are shortened rather than dropped.
+KEEP_PRIORITY = 7
+
+
+@dataclass
+class Trimmed:
+    text: str
+    tokens: int
+    dropped: List[str] = field(default_factory=list)
+
+
+def _truncate(text: str, budget: int, model: str) -> str:
+    """Keep ``text`` from the top up to ``budget`` tokens: whole lines, then
+    the leading words of the first line that does not fit."""
+    lines, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line, model) + 1
+        if used + cost > budget:
+            pieces = int((budget - used - 1) / _factor(model))
+            if pieces > 0:
+                ends = [m.end() for m in _PIECES.finditer(line)]
+                lines.append(line[:ends[min(pieces, len(ends)) - 1]])
+            break
+        used += cost
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def fit_text(text: str, budget: int, model: str, priorities: dict, default: int = 5, label: str = 'text') -> Trimmed:
+    """Fit ``text`` into ``budget`` tokens, lowest-priority sections first.
+
+    Sections below KEEP_PRIORITY are dropped whole, but never the last
+    one left. If that is not enough, the lowest-priority remaining section
+    that can absorb the overflow loses its tail (whole lines, then words),
+    so e.g. a long experience section or a description that is one long
+    line is shortened rather than disappearing.
+    """
+    text = compact(text)
+    tokens = estimate_tokens(text, model)
+    if tokens <= budget:
+        return Trimmed(text, tokens)
+
+    sections = split_sections(text, priorities, default)
+    costs = {id(s): estimate_tokens(s.text, model) for s in sections}
+    total = sum(costs.values())
+    dropped: List[str] = []
+    for s in sorted(sections, key=lambda s: s.priority):
+        if total <= budget or s.priority >= KEEP_PRIORITY or sum(1 for x in sections if x.text) == 1:
+            break
+        total -= costs[id(s)]
+        s.text = ''
+        dropped.append(f"{label}: section '{s.title}'")
+
+    while total > budget:
+        over = total - budget
+        kept = [s for s in sections if s.text]
+        fits = [s for s in kept if costs[id(s)] > over]
+        if not fits and len(kept) > 1:
+            # No single section can absorb the overflow: lose the largest.
+            s = max(kept, key=lambda s: costs[id(s)])
+            total -= costs[id(s)]
+            s.text = ''
+            dropped.append(f"{label}: section '{s.title}'")
+            continue
+        s = min(fits or kept, key=lambda s: s.priority)
+        cost = costs[id(s)]
+        s.text = _truncate(s.text, cost - over, model)
+        kept_tokens = estimate_tokens(s.text, model)
+        total -= cost - kept_tokens
+        dropped.append(f"{label}: truncated '{s.title}' (~{100 * (cost - kept_tokens) // cost}% cut)")
+        break
+
+    out = '\n'.join(s.text.rstrip() for s in sections if s.text).strip()
+    return Trimmed(out, estimate_tokens(out, model), dropped)
+
+
+def reserved_output_tokens(params: dict) -> int:
+    return int(params.get('max_tokens') or params.get('max_new_tokens') or settings.LLM_RESERVED_OUTPUT_TOKENS)
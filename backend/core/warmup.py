@@ -0,0 +1,191 @@
+"""Warm-up and keep-alive for local models (Ollama, OllaBridge).
+
+A cold ``deepseek-r1`` takes 10-40 s to load, which the first request
+after idle would otherwise pay. The warmer preloads the model at startup
+and whenever the active provider or its model changes (SettingsManager
+calls ``trigger()``), then pings it every LLM_KEEPALIVE_INTERVAL_SECONDS
+so it is not unloaded between requests.
+
+Both backends are driven through Ollama's native API (OllaBridge proxies
+it): an empty ``/api/generate`` loads the model, ``/api/ps`` reports
+what is loaded.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend.core.http_clients import llm_clients
+from backend.core.settings import settings
+
+LOCAL_PROVIDERS = ('ollabridge', 'ollama')
+
+
+@dataclass(frozen=True)
+class WarmTarget:
+    provider: str
+    base_url: str
+    model: str
+    api_key: str = ''
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        if not self.api_key:
+            return {}
+        return {'X-API-Key': self.api_key, 'Authorization': f"Bearer {self.api_key}"}
+
+
+@dataclass
+class WarmState:
+    warmed_at: Optional[float] = None
+    load_seconds: Optional[float] = None
+    pings: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+
+
+def _same_model(name: str, model: str) -> bool:
+    # /api/ps reports 'deepseek-r1:latest' for a request made as 'deepseek-r1'.
+    return name == model or (':' not in model and name == f"{model}:latest")
+
+
+def _target(provider: str, cfg: Dict[str, Any]) -> Optional[WarmTarget]:
+    if not cfg.get('base_url') or not cfg.get('model'):
+        return None
+    return WarmTarget(provider, cfg['base_url'].rstrip('/'), cfg['model'], cfg.get('api_key') or '')
+
+
+class ModelWarmer:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.states: Dict[WarmTarget, WarmState] = {}
+
+    def targets(self) -> List[WarmTarget]:
+        """Local models worth keeping warm: the active provider chosen in the
+        settings UI and the router's default provider."""
+        from backend.core.settings_manager import get_settings_manager
+
+        manager = get_settings_manager()
+        out: List[WarmTarget] = []
+        active = manager.get_active_provider()
+        if active in LOCAL_PROVIDERS:
+            out.append(_target(active, manager.get_provider_config(active)))
+        if settings.DEFAULT_PROVIDER == 'ollama':
+            out.append(_target('ollama', {'base_url': settings.OLLAMA_BASE_URL, 'model': settings.OLLAMA_MODEL}))
+        elif settings.DEFAULT_PROVIDER == 'ollabridge':
+            out.append(_target('ollabridge', {
+                'base_url': settings.OLLABRIDGE_BASE_URL,
+                'model': settings.OLLABRIDGE_MODEL,
+                'api_key': settings.OLLABRIDGE_API_KEY,
+            }))
+        return list(dict.fromkeys(t for t in out if t))
+
+    async def warm(self, target: WarmTarget) -> None:
+        """Load ``target``'s model (or refresh its keep-alive timer)."""
+        from backend.providers.ollama import ollama_options
+
+        payload: Dict[str, Any] = {'model': target.model, 'keep_alive': settings.OLLAMA_KEEP_ALIVE}
+        if target.provider == 'ollama':
+            # Must match the chat requests' options or Ollama reloads the model.
+            payload['options'] = ollama_options()
+        state = self.states.setdefault(target, WarmState())
+        started = time.monotonic()
+        try:
+            r = await llm_clients.get(target.provider).post(
+                f"{target.base_url}/api/generate",
+                json=payload,
+                headers=target.headers,
+                timeout=settings.LLM_WARMUP_TIMEOUT_SECONDS,
+            )
+            r.raise_for_status()
+        except Exception as e:
+            state.failures += 1
+            state.last_error = f"{type(e).__name__}: {e}"
+            return
+        state.pings += 1
+        state.warmed_at = time.time()
+        state.load_seconds = round(time.monotonic() - started, 3)
+        state.last_error = None
+
+    async def loaded(self, target: WarmTarget) -> Optional[Dict[str, Any]]:
+        """The ``/api/ps`` entry for ``target``'s model, {} if not loaded, None if unknown."""
+        try:
+            r = await llm_clients.get(target.provider).get(f"{target.base_url}/api/ps", headers=target.headers, timeout=5.0)
+            r.raise_for_status()
+        except httpx.HTTPError:
+            return None
+        for m in r.json().get('models', []):
+            if _same_model(m.get('name') or m.get('model') or '', target.model):
+                return m
+        return {}
+
+    async def warm_all(self) -> None:
+        await asyncio.gather(*(self.warm(t) for t in self.targets()))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.warm_all()
+            except Exception as e:  # keep the loop alive; per-target errors are in states
+                print(f"Warning: model warm-up failed: {e}")
+            interval = settings.LLM_KEEPALIVE_INTERVAL_SECONDS or None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start the warm-up loop (app startup)."""
+        if not settings.LLM_WARMUP_ENABLED or self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def trigger(self) -> None:
+        """Warm now, e.g. after the active provider or model changed."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def status(self) -> Dict[str, Any]:
+        targets = self.targets()
+        entries = await asyncio.gather(*(self.loaded(t) for t in targets))
+        out = []
+        for t, entry in zip(targets, entries):
+            st = self.states.get(t, WarmState())
+            out.append({
+                'provider': t.provider,
+                'model': t.model,
+                'base_url': t.base_url,
+                'state': 'unknown' if entry is None else ('loaded' if entry else 'unloaded'),
+                'expires_at': (entry or {}).get('expires_at'),
+                'size_vram': (entry or {}).get('size_vram'),
+                'last_warmed_at': st.warmed_at,
+                'last_warm_seconds': st.load_seconds,
+                'pings': st.pings,
+                'failures': st.failures,
+                'last_error': st.last_error,
+            })
+        return {
+            'enabled': settings.LLM_WARMUP_ENABLED,
+            'running': self._task is not None and not self._task.done(),
+            'keepalive_interval_seconds': settings.LLM_KEEPALIVE_INTERVAL_SECONDS,
+            'models': out,
+        }
+
+
+model_warmer = ModelWarmer()
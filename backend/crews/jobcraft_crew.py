@@ -1,11 +1,23 @@
-from __future__ import annotations
-
 """CrewAI tasks (kept minimal, router-driven).
 We do NOT submit applications. We only prepare materials + checklists.
 """
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Sequence
 
-from dataclasses import dataclass
 from backend.core.router import router
+from backend.core.settings import settings
+from backend.core.token_budget import (
+    CV_PRIORITIES,
+    JD_PRIORITIES,
+    Trimmed,
+    context_window,
+    estimate_tokens,
+    fit_text,
+    reserved_output_tokens,
+)
 
 SYSTEM_BASE = """You are JobCraft Copilot.
 Rules:
@@ -18,25 +30,62 @@ Rules:
 @dataclass
 class PacketResult:
     markdown: str
+    dropped: list[str] = field(default_factory=list)  # what was trimmed to fit the context window
 
-async def build_application_packet(
-    provider: str,
+@dataclass
+class PacketInputs:
+    profile_text: str
+    job_desc: str
+    prompt_tokens: int
+    budget: int
+    dropped: list[str] = field(default_factory=list)
+
+@dataclass
+class PacketJob:
+    job_title: str
+    company: str
+    job_desc: str
+    country: str | None = None
+    ref: str | None = None  # caller's id for the job (e.g. tracker id)
+
+@dataclass
+class BatchPacketResult:
+    index: int
+    ref: str | None
+    job_title: str
+    company: str
+    markdown: str | None = None
+    error: str | None = None
+    dropped: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def _packet_prompt(
     profile_text: str,
     job_title: str,
     company: str,
     job_desc: str,
     country: str | None = None,
-) -> PacketResult:
-    locale_hint = "Use UK English spelling." if (country or '').upper() in ('GB', 'UK') else "Use clear international English suitable for Europe."
-
-    user = f"""Create a tailored application packet.
+) -> tuple[str, str]:
+    """Return (prefix, user) for a packet request.
 
-{locale_hint}
+    The CV is the stable part across jobs, so it goes in the prefix right
+    after SYSTEM_BASE; everything that varies per job (locale hint, role,
+    description) follows in the user message. Providers can then reuse a
+    cached prompt prefix when one CV is used for many packets.
+    """
+    locale_hint = "Use UK English spelling." if (country or '').upper() in ('GB', 'UK') else "Use clear international English suitable for Europe."
 
-Candidate profile (raw CV text):
+    prefix = f"""Candidate profile (raw CV text):
 ---
 {profile_text}
----
+---"""
+
+    user = f"""Create a tailored application packet for the candidate profile above.
+
+{locale_hint}
 
 Target role:
 - Title: {job_title}
@@ -56,5 +105,131 @@ Deliverables (Markdown, with headings):
 
 Avoid exaggerations or unverifiable claims.
 """
-    text = await router.chat(provider, system=SYSTEM_BASE, user=user)
-    return PacketResult(markdown=text)
+    return prefix, user
+
+def _window(provider: str) -> tuple[str, int]:
+    """(model, tokens available for the prompt) for ``provider``."""
+    p = router.provider(provider)
+    return p.model, context_window(p.name, p.model) - reserved_output_tokens(p.params)
+
+def fit_packet_cv(provider: str, profile_text: str) -> Trimmed:
+    """Fit the CV to its fixed PACKET_CV_SHARE of the prompt budget.
+
+    The budget depends only on the provider and the job-independent prompt
+    text, never on the job, so one CV yields the same cacheable prefix for
+    every job in a batch. Low-priority sections (hobbies, references) go
+    first.
+    """
+    model, available = _window(provider)
+    prefix, _ = _packet_prompt('', '', '', '', None)
+    stable = estimate_tokens(SYSTEM_BASE, model) + estimate_tokens(prefix, model)
+    budget = max(0, int((available - stable) * settings.PACKET_CV_SHARE))
+    return fit_text(profile_text, budget, model, CV_PRIORITIES, default=8, label='cv')
+
+def fit_packet_inputs(
+    provider: str,
+    profile_text: str,
+    job_title: str,
+    company: str,
+    job_desc: str,
+    country: str | None = None,
+    cv: Trimmed | None = None,
+) -> PacketInputs:
+    """Trim the CV and job description to the provider's context window.
+
+    The CV is fitted by fit_packet_cv (pass ``cv`` to reuse one fit across
+    jobs); the job description gets what is left of the window after the
+    reserved output tokens, the fixed prompt text and the CV, losing its
+    company blurb and EEO text first. Inputs that fit are only
+    whitespace-compacted.
+    """
+    model, available = _window(provider)
+    prefix, user = _packet_prompt('', job_title, company, '', country)
+    fixed = sum(estimate_tokens(part, model) for part in (SYSTEM_BASE, prefix, user))
+    budget = max(0, available - fixed)
+
+    cv = cv or fit_packet_cv(provider, profile_text)
+    jd = fit_text(job_desc, max(0, budget - cv.tokens), model, JD_PRIORITIES, default=6, label='job description')
+    return PacketInputs(
+        profile_text=cv.text,
+        job_desc=jd.text,
+        prompt_tokens=fixed + cv.tokens + jd.tokens,
+        budget=budget + fixed,
+        dropped=cv.dropped + jd.dropped,
+    )
+
+async def build_application_packet(
+    provider: str,
+    profile_text: str,
+    job_title: str,
+    company: str,
+    job_desc: str,
+    country: str | None = None,
+    no_cache: bool = False,
+    refresh: bool = False,
+    inputs: PacketInputs | None = None,
+) -> PacketResult:
+    """``inputs`` are already fitted inputs (fit_packet_inputs); without them
+    the CV and job description are fitted here."""
+    inputs = inputs or fit_packet_inputs(provider, profile_text, job_title, company, job_desc, country)
+    prefix, user = _packet_prompt(inputs.profile_text, job_title, company, inputs.job_desc, country)
+    text = await router.chat(provider, system=SYSTEM_BASE, prefix=prefix, user=user, no_cache=no_cache, refresh=refresh)
+    return PacketResult(markdown=text, dropped=inputs.dropped)
+
+async def stream_application_packet(
+    provider: str,
+    profile_text: str,
+    job_title: str,
+    company: str,
+    job_desc: str,
+    country: str | None = None,
+    no_cache: bool = False,
+    refresh: bool = False,
+    inputs: PacketInputs | None = None,
+) -> AsyncIterator[str]:
+    """Same packet as build_application_packet, yielded as markdown chunks."""
+    inputs = inputs or fit_packet_inputs(provider, profile_text, job_title, company, job_desc, country)
+    prefix, user = _packet_prompt(inputs.profile_text, job_title, company, inputs.job_desc, country)
+    async for chunk in router.chat_stream(provider, system=SYSTEM_BASE, prefix=prefix, user=user, no_cache=no_cache, refresh=refresh):
+        yield chunk
+
+async def build_application_packets(
+    provider: str,
+    profile_text: str,
+    jobs: Sequence[PacketJob],
+    concurrency: int | None = None,
+    no_cache: bool = False,
+    refresh: bool = False,
+) -> AsyncIterator[BatchPacketResult]:
+    """One CV against many jobs.
+
+    Packets are generated with at most ``concurrency`` in flight and yielded
+    in completion order. A failed job yields a result with ``error`` set;
+    the rest of the batch carries on.
+    """
+    sem = asyncio.Semaphore(concurrency or settings.PACKET_BATCH_CONCURRENCY)
+    cv = fit_packet_cv(provider, profile_text)  # the same for every job
+
+    async def one(index: int, job: PacketJob) -> BatchPacketResult:
+        result = BatchPacketResult(index=index, ref=job.ref, job_title=job.job_title, company=job.company)
+        async with sem:
+            try:
+                inputs = fit_packet_inputs(provider, profile_text, job.job_title, job.company, job.job_desc, job.country, cv=cv)
+                packet = await build_application_packet(
+                    provider, profile_text, job.job_title, job.company, job.job_desc,
+                    country=job.country, no_cache=no_cache, refresh=refresh, inputs=inputs,
+                )
+                result.markdown = packet.markdown
+                result.dropped = packet.dropped
+            except Exception as e:
+                result.error = str(e) or type(e).__name__
+        return result
+
+    tasks = [asyncio.ensure_future(one(i, job)) for i, job in enumerate(jobs)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away or the caller stopped early: drop the rest.
+        for task in tasks:
+            task.cancel()
@@ -6,11 +6,25 @@ from backend.routers.meta import router as meta_router
 from backend.routers.ollabridge_connect import router as ollabridge_router
 from backend.routers.jobcraft import router as jobcraft_router
 from backend.routers.discovery import router as discovery_router
+from backend.routers.crawler import router as crawler_router
+from backend.routers.postings import router as postings_router
 from backend.routers.tracker import router as tracker_router
 from backend.routers.digest import router as digest_router
 from backend.routers.assist import router as assist_router
 from backend.routers.providers import router as providers_router
+from backend.core.body_limit import BodySizeLimitMiddleware
 from backend.core.db import init_db
+from backend.core.http_clients import llm_clients
+from backend.core.metrics import MetricsMiddleware
+from backend.core.router import router as llm_router
+from backend.core.settings import settings
+from backend.core.warmup import model_warmer
+from backend.services.connectors import http as connector_http
+from backend.services.crawler import crawler
+from backend.services.cv_cache import purge_uploads
+from backend.services.postings import prune_changes
+from backend.services.cv_parser import cv_pool
+from backend.services.packet_jobs import packet_jobs
 
 app = FastAPI(title='JobCraft Copilot API')
 
@@ -21,10 +35,27 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*'],
 )
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=lambda: settings.MAX_REQUEST_BYTES)
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event('startup')
 def _startup():
     init_db()
+    purge_uploads()
+    prune_changes()
+    llm_router.open_clients()
+    model_warmer.start()
+    packet_jobs.start()
+    crawler.start()
+
+@app.on_event('shutdown')
+async def _shutdown():
+    await crawler.stop()
+    await packet_jobs.stop()
+    await model_warmer.stop()
+    await llm_clients.aclose()
+    await connector_http.aclose()
+    cv_pool.shutdown()
 
 app.include_router(health_router)
 app.include_router(meta_router, prefix='/api')
@@ -32,6 +63,8 @@ app.include_router(ollabridge_router, prefix='/api')
 app.include_router(providers_router)
 app.include_router(jobcraft_router, prefix='/api')
 app.include_router(discovery_router, prefix='/api')
+app.include_router(crawler_router, prefix='/api')
+app.include_router(postings_router, prefix='/api')
 app.include_router(tracker_router, prefix='/api')
 app.include_router(digest_router, prefix='/api')
 app.include_router(assist_router, prefix='/api')
@@ -1,32 +1,77 @@
 from __future__ import annotations
 
-import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import AsyncIterator
+
 from backend.core.settings import settings
-from .base import LLMProvider
+from .base import LLMProvider, ProviderConfigError, iter_sse_json, llm_retry
+
+URL = 'https://api.anthropic.com/v1/messages'
 
 class AnthropicProvider(LLMProvider):
     name = 'anthropic'
+    params = {'max_tokens': 1024}
+
+    @property
+    def model(self) -> str:
+        return settings.ANTHROPIC_MODEL
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=0.5, max=4))
-    async def chat(self, *, system: str, user: str) -> str:
+    def _request(self, system: str, user: str, prefix: str = '', *, stream: bool = False) -> tuple[dict, dict]:
         if not settings.ANTHROPIC_API_KEY:
-            raise RuntimeError('ANTHROPIC_API_KEY is not set')
+            raise ProviderConfigError('ANTHROPIC_API_KEY is not set')
 
+        system_blocks = [{'type': 'text', 'text': system}]
+        if prefix:
+            # Cache breakpoint after the stable context: later calls with the
+            # same system + prefix read it from Anthropic's prompt cache.
+            system_blocks.append({'type': 'text', 'text': prefix, 'cache_control': {'type': 'ephemeral'}})
         payload = {
-            'model': settings.ANTHROPIC_MODEL,
-            'max_tokens': 1024,
-            'system': system,
+            'model': self.model,
+            'max_tokens': self.params['max_tokens'],
+            'system': system_blocks if prefix else system,
             'messages': [{'role': 'user', 'content': user}],
         }
+        if stream:
+            payload['stream'] = True
         headers = {
             'x-api-key': settings.ANTHROPIC_API_KEY,
             'anthropic-version': '2023-06-01',
             'content-type': 'application/json',
         }
-        async with httpx.AsyncClient(timeout=90) as client:
-            r = await client.post('https://api.anthropic.com/v1/messages', json=payload, headers=headers)
+        return payload, headers
+
+    def _record(self, usage: dict | None) -> None:
+        if usage:
+            cached = usage.get('cache_read_input_tokens') or 0
+            self.record_usage(
+                prompt_tokens=(usage.get('input_tokens') or 0) + cached + (usage.get('cache_creation_input_tokens') or 0),
+                cached_tokens=cached,
+                completion_tokens=usage.get('output_tokens') or 0,
+            )
+
+    @llm_retry
+    async def chat(self, *, system: str, user: str, prefix: str = '') -> str:
+        payload, headers = self._request(system, user, prefix)
+        client = self.client()
+        r = await client.post(URL, json=payload, headers=headers)
+        r.raise_for_status()
+        data = r.json()
+        self._record(data.get('usage'))
+        blocks = data.get('content', [])
+        return ''.join(b.get('text', '') for b in blocks if b.get('type') == 'text')
+
+    async def chat_stream(self, *, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        payload, headers = self._request(system, user, prefix, stream=True)
+        async with self.client().stream('POST', URL, json=payload, headers=headers) as r:
             r.raise_for_status()
-            data = r.json()
-            blocks = data.get('content', [])
-            return ''.join(b.get('text', '') for b in blocks if b.get('type') == 'text')
+            async for event in iter_sse_json(r):
+                kind = event.get('type')
+                if kind == 'message_start':
+                    self._record(event.get('message', {}).get('usage'))
+                elif kind == 'content_block_delta':
+                    delta = event.get('delta', {})
+                    if delta.get('type') == 'text_delta' and delta.get('text'):
+                        yield delta['text']
+                elif kind == 'error':
+                    raise RuntimeError(f"Anthropic error: {event.get('error', {}).get('message', event)}")
+                elif kind == 'message_stop':
+                    break
@@ -1,9 +1,118 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
+import json
+
+import httpx
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+from backend.core.http_clients import llm_clients
+from backend.core.metrics import LLM_RETRIES
+from backend.core.rate_limit import is_rate_limited
+
+class ProviderConfigError(RuntimeError):
+    """Provider is missing credentials or settings; retrying cannot help."""
+
+def is_client_error(exc: BaseException) -> bool:
+    """Errors caused by our request/config rather than upstream health:
+    configuration errors and HTTP 4xx other than 408 and 429."""
+    if isinstance(exc, ProviderConfigError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return 400 <= code < 500 and code not in (408, 429)
+    return False
+
+def retryable(exc: BaseException) -> bool:
+    """Retry transport errors, timeouts and 5xx. Client errors fail at once;
+    429s are left to the router's rate limiter, which honours Retry-After."""
+    return not (is_client_error(exc) or is_rate_limited(exc))
+
+def _count_retry(state: RetryCallState) -> None:
+    provider = state.args[0] if state.args else None
+    if isinstance(provider, LLMProvider):
+        LLM_RETRIES.inc(provider.name, provider.model, 'transient')
+
+# Shared retry policy for the blocking chat() calls.
+llm_retry = retry(
+    retry=retry_if_exception(retryable),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(min=0.5, max=4),
+    before_sleep=_count_retry,
+    reraise=True,
+)
+
+async def iter_sse_json(response: httpx.Response) -> AsyncIterator[dict]:
+    """Decode the ``data:`` payloads of a server-sent-events response."""
+    async for line in response.aiter_lines():
+        if not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if not data:
+            continue
+        if data == '[DONE]':
+            break
+        yield json.loads(data)
+
+async def iter_ndjson(response: httpx.Response) -> AsyncIterator[dict]:
+    """Decode a newline-delimited JSON response (Ollama native streaming)."""
+    async for line in response.aiter_lines():
+        if line.strip():
+            yield json.loads(line)
+
+def join_prompt(*parts: str) -> str:
+    return '\n\n'.join(p for p in parts if p)
 
 class LLMProvider(ABC):
+    """Chat provider.
+
+    ``prefix`` is long, stable context (e.g. the candidate CV) that sits
+    between the system prompt and the per-request ``user`` message. Keeping
+    it first and identical across calls lets providers reuse a cached
+    prompt prefix; each provider maps it onto its native caching feature.
+    """
     name: str
+    timeout: float = 90
+    # Fixed generation parameters sent with every request (part of the cache key).
+    params: dict = {}
+
+    def __init__(self):
+        self.usage = {'requests': 0, 'prompt_tokens': 0, 'cached_tokens': 0, 'completion_tokens': 0}
+
+    def record_usage(self, prompt_tokens: int = 0, cached_tokens: int = 0, completion_tokens: int = 0) -> None:
+        """Accumulate token counts reported by the upstream response."""
+        self.usage['requests'] += 1
+        self.usage['prompt_tokens'] += prompt_tokens or 0
+        self.usage['cached_tokens'] += cached_tokens or 0
+        self.usage['completion_tokens'] += completion_tokens or 0
+
+    def record_openai_usage(self, usage: dict | None) -> None:
+        """``usage`` block of an OpenAI-style response (cached tokens included)."""
+        if usage:
+            self.record_usage(
+                prompt_tokens=usage.get('prompt_tokens', 0),
+                cached_tokens=(usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0),
+                completion_tokens=usage.get('completion_tokens', 0),
+            )
+
+    @property
+    def model(self) -> str:
+        """Model id the provider is currently configured to call."""
+        return ''
+
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client for this provider (see backend.core.http_clients)."""
+        return llm_clients.get(self.name, timeout=self.timeout)
 
     @abstractmethod
-    async def chat(self, *, system: str, user: str) -> str:
+    async def chat(self, *, system: str, user: str, prefix: str = '') -> str:
         raise NotImplementedError
+
+    async def chat_stream(self, *, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        """Yield the reply as text chunks.
+
+        Streaming calls are not retried: once tokens reach the caller a
+        replay would duplicate output. Providers without a native streaming
+        API fall back to a single chunk.
+        """
+        yield await self.chat(system=system, user=user, prefix=prefix)
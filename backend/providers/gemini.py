@@ -1,30 +1,116 @@
 from __future__ import annotations
 
-import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import hashlib
+import time
+from typing import AsyncIterator
+
 from backend.core.settings import settings
-from .base import LLMProvider
+from .base import LLMProvider, ProviderConfigError, iter_sse_json, join_prompt, llm_retry
+
+API_ROOT = 'https://generativelanguage.googleapis.com/v1beta'
+BASE_URL = f"{API_ROOT}/models"
+
+def _text(data: dict) -> str:
+    cands = data.get('candidates', [])
+    if not cands:
+        return ''
+    parts = cands[0].get('content', {}).get('parts', [])
+    return ''.join(p.get('text', '') for p in parts)
+
+def _user(text: str) -> dict:
+    return {'role': 'user', 'parts': [{'text': text}]}
 
 class GeminiProvider(LLMProvider):
     name = 'gemini'
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=0.5, max=4))
-    async def chat(self, *, system: str, user: str) -> str:
+    def __init__(self):
+        super().__init__()
+        # sha256(model, system, prefix) -> (cachedContents name or None if
+        # creation failed, expires_at); oldest first, at most
+        # GEMINI_CACHE_MAX_ENTRIES
+        self._context_caches: dict[str, tuple[str | None, float]] = {}
+
+    @property
+    def model(self) -> str:
+        return settings.GEMINI_MODEL
+
+    async def _cached_content(self, system: str, prefix: str) -> str | None:
+        """Name of a ``cachedContents`` entry holding system + prefix, if usable.
+
+        Created on first use for prefixes of at least GEMINI_CACHE_MIN_CHARS
+        and reused until shortly before its TTL runs out. A failed creation
+        (e.g. below the model's minimum cacheable size) is remembered and
+        the prefix is sent inline instead.
+        """
+        if not prefix or len(prefix) < settings.GEMINI_CACHE_MIN_CHARS:
+            return None
+        key = hashlib.sha256(f"{self.model}\0{system}\0{prefix}".encode('utf-8')).hexdigest()
+        hit = self._context_caches.get(key)
+        if hit and hit[1] > time.time() + 30:
+            self._remember(key, hit)
+            return hit[0]
+
+        ttl = settings.GEMINI_CACHE_TTL_SECONDS
+        r = await self.client().post(
+            f"{API_ROOT}/cachedContents?key={settings.GEMINI_API_KEY}",
+            json={
+                'model': f"models/{self.model}",
+                'contents': [_user(join_prompt(system, prefix))],
+                'ttl': f"{ttl}s",
+            },
+        )
+        name = r.json().get('name') if r.status_code < 400 else None
+        self._remember(key, (name, time.time() + ttl))
+        return name
+
+    def _remember(self, key: str, entry: tuple[str | None, float]) -> None:
+        self._context_caches.pop(key, None)
+        self._context_caches[key] = entry
+        now = time.time()
+        for k in [k for k, (_, expires_at) in self._context_caches.items() if expires_at <= now]:
+            del self._context_caches[k]
+        while len(self._context_caches) > settings.GEMINI_CACHE_MAX_ENTRIES:
+            del self._context_caches[next(iter(self._context_caches))]  # least recently used
+
+    async def _payload(self, system: str, user: str, prefix: str) -> dict:
         if not settings.GEMINI_API_KEY:
-            raise RuntimeError('GEMINI_API_KEY is not set')
-
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{settings.GEMINI_MODEL}:generateContent?key={settings.GEMINI_API_KEY}"
-        payload = {
-            'contents': [
-                {'role': 'user', 'parts': [{'text': f\"{system}\n\n{user}\"}]}
-            ]
-        }
-        async with httpx.AsyncClient(timeout=90) as client:
-            r = await client.post(url, json=payload)
+            raise ProviderConfigError('GEMINI_API_KEY is not set')
+
+        cached = await self._cached_content(system, prefix)
+        if cached:
+            return {'cachedContent': cached, 'contents': [_user(user)]}
+        return {'contents': [_user(join_prompt(system, prefix, user))]}
+
+    def _record(self, data: dict) -> None:
+        meta = data.get('usageMetadata')
+        if meta:
+            self.record_usage(
+                prompt_tokens=meta.get('promptTokenCount', 0),
+                cached_tokens=meta.get('cachedContentTokenCount', 0),
+                completion_tokens=meta.get('candidatesTokenCount', 0),
+            )
+
+    @llm_retry
+    async def chat(self, *, system: str, user: str, prefix: str = '') -> str:
+        payload = await self._payload(system, user, prefix)
+        url = f"{BASE_URL}/{self.model}:generateContent?key={settings.GEMINI_API_KEY}"
+        client = self.client()
+        r = await client.post(url, json=payload)
+        r.raise_for_status()
+        data = r.json()
+        self._record(data)
+        return _text(data)
+
+    async def chat_stream(self, *, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        payload = await self._payload(system, user, prefix)
+        url = f"{BASE_URL}/{self.model}:streamGenerateContent?alt=sse&key={settings.GEMINI_API_KEY}"
+        usage: dict = {}
+        async with self.client().stream('POST', url, json=payload) as r:
             r.raise_for_status()
-            data = r.json()
-            cands = data.get('candidates', [])
-            if not cands:
-                return ''
-            parts = cands[0].get('content', {}).get('parts', [])
-            return ''.join(p.get('text', '') for p in parts)
+            async for event in iter_sse_json(r):
+                # Every chunk carries cumulative usage; keep the last one.
+                usage = event.get('usageMetadata') or usage
+                text = _text(event)
+                if text:
+                    yield text
+        self._record({'usageMetadata': usage})
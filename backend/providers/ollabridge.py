@@ -1,23 +1,26 @@
 from __future__ import annotations
 
-import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import AsyncIterator
 
 from backend.core.settings import settings
-from .base import LLMProvider
+from .base import LLMProvider, ProviderConfigError, iter_sse_json, join_prompt, llm_retry
 
 def _norm_base(url: str) -> str:
     return url.rstrip('/')
 
 class OllaBridgeProvider(LLMProvider):
     name = 'ollabridge'
+    timeout = 120
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=0.5, max=4))
-    async def chat(self, *, system: str, user: str) -> str:
+    @property
+    def model(self) -> str:
+        return settings.OLLABRIDGE_MODEL
+
+    def _request(self, system: str, user: str, prefix: str = '', *, stream: bool = False) -> tuple[str, dict, dict]:
         if not settings.OLLABRIDGE_BASE_URL:
-            raise RuntimeError('OLLABRIDGE_BASE_URL is not set (set it to your PC OllaBridge, e.g. http://localhost:11435)')
+            raise ProviderConfigError('OLLABRIDGE_BASE_URL is not set (set it to your PC OllaBridge, e.g. http://localhost:11435)')
         if not settings.OLLABRIDGE_API_KEY:
-            raise RuntimeError('OLLABRIDGE_API_KEY is not set (copy it from `ollabridge start` output)')
+            raise ProviderConfigError('OLLABRIDGE_API_KEY is not set (copy it from `ollabridge start` output)')
 
         url = f"{_norm_base(settings.OLLABRIDGE_BASE_URL)}/v1/chat/completions"
         headers = {
@@ -27,17 +30,35 @@ class OllaBridgeProvider(LLMProvider):
             'Content-Type': 'application/json',
         }
         payload = {
-            'model': settings.OLLABRIDGE_MODEL,
+            'model': self.model,
             'messages': [
-                {'role': 'system', 'content': system},
+                # Stable context first so Ollama can reuse its KV cache.
+                {'role': 'system', 'content': join_prompt(system, prefix)},
                 {'role': 'user', 'content': user},
             ],
-            'stream': False,
+            'stream': stream,
         }
+        return url, payload, headers
+
+    @llm_retry
+    async def chat(self, *, system: str, user: str, prefix: str = '') -> str:
+        url, payload, headers = self._request(system, user, prefix)
+        client = self.client()
+        r = await client.post(url, json=payload, headers=headers)
+        r.raise_for_status()
+        data = r.json()
+        self.record_openai_usage(data.get('usage'))
+        # OpenAI-like shape
+        return data['choices'][0]['message']['content']
 
-        async with httpx.AsyncClient(timeout=120) as client:
-            r = await client.post(url, json=payload, headers=headers)
+    async def chat_stream(self, *, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        url, payload, headers = self._request(system, user, prefix, stream=True)
+        async with self.client().stream('POST', url, json=payload, headers=headers) as r:
             r.raise_for_status()
-            data = r.json()
-            # OpenAI-like shape
-            return data['choices'][0]['message']['content']
+            # OpenAI-like SSE chunks
+            async for event in iter_sse_json(r):
+                self.record_openai_usage(event.get('usage'))
+                choices = event.get('choices') or []
+                text = choices[0].get('delta', {}).get('content') if choices else None
+                if text:
+                    yield text
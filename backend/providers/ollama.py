@@ -1,26 +1,67 @@
 from __future__ import annotations
 
-import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import json
+from typing import AsyncIterator
 
 from backend.core.settings import settings
-from .base import LLMProvider
+from .base import LLMProvider, iter_ndjson, join_prompt, llm_retry
+
+def ollama_options() -> dict:
+    """Runtime ``options`` sent with every request and warm-up.
+
+    Ollama reloads the model when num_ctx changes between requests, so
+    chat and warm-up must send the same values.
+    """
+    extra = json.loads(settings.OLLAMA_OPTIONS) if settings.OLLAMA_OPTIONS else {}
+    return {'num_ctx': settings.OLLAMA_NUM_CTX, **extra}
 
 class OllamaProvider(LLMProvider):
     name = 'ollama'
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=0.5, max=4))
-    async def chat(self, *, system: str, user: str) -> str:
+    @property
+    def model(self) -> str:
+        return settings.OLLAMA_MODEL
+
+    def _request(self, system: str, user: str, prefix: str = '', *, stream: bool = False) -> tuple[str, dict]:
         payload = {
-            'model': settings.OLLAMA_MODEL,
+            'model': self.model,
             'messages': [
-                {'role': 'system', 'content': system},
+                # Stable context first: Ollama reuses the KV cache for a
+                # matching prompt prefix while the model stays loaded.
+                {'role': 'system', 'content': join_prompt(system, prefix)},
                 {'role': 'user', 'content': user},
             ],
-            'stream': False,
+            'stream': stream,
+            'keep_alive': settings.OLLAMA_KEEP_ALIVE,
+            'options': ollama_options(),
         }
-        async with httpx.AsyncClient(timeout=90) as client:
-            r = await client.post(f"{settings.OLLAMA_BASE_URL.rstrip('/')}/api/chat", json=payload)
+        return f"{settings.OLLAMA_BASE_URL.rstrip('/')}/api/chat", payload
+
+    def _record(self, data: dict) -> None:
+        # Ollama reports evaluated prompt tokens only; a reused prefix shows
+        # up as a smaller prompt_eval_count rather than a cached count.
+        self.record_usage(prompt_tokens=data.get('prompt_eval_count', 0), completion_tokens=data.get('eval_count', 0))
+
+    @llm_retry
+    async def chat(self, *, system: str, user: str, prefix: str = '') -> str:
+        url, payload = self._request(system, user, prefix)
+        client = self.client()
+        r = await client.post(url, json=payload)
+        r.raise_for_status()
+        data = r.json()
+        self._record(data)
+        return data.get('message', {}).get('content', '') or ''
+
+    async def chat_stream(self, *, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        url, payload = self._request(system, user, prefix, stream=True)
+        async with self.client().stream('POST', url, json=payload) as r:
             r.raise_for_status()
-            data = r.json()
-            return data.get('message', {}).get('content', '') or ''
+            async for event in iter_ndjson(r):
+                if event.get('error'):
+                    raise RuntimeError(f"Ollama error: {event['error']}")
+                text = event.get('message', {}).get('content')
+                if text:
+                    yield text
+                if event.get('done'):
+                    self._record(event)
+                    break
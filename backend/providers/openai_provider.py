@@ -1,31 +1,58 @@
 from __future__ import annotations
 
-import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import AsyncIterator
+
 from backend.core.settings import settings
-from .base import LLMProvider
+from .base import LLMProvider, ProviderConfigError, iter_sse_json, join_prompt, llm_retry
+
+URL = 'https://api.openai.com/v1/chat/completions'
 
 class OpenAIProvider(LLMProvider):
     name = 'openai'
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=0.5, max=4))
-    async def chat(self, *, system: str, user: str) -> str:
+    @property
+    def model(self) -> str:
+        return settings.OPENAI_MODEL
+
+    def _request(self, system: str, user: str, prefix: str = '', *, stream: bool = False) -> tuple[dict, dict]:
         if not settings.OPENAI_API_KEY:
-            raise RuntimeError('OPENAI_API_KEY is not set')
+            raise ProviderConfigError('OPENAI_API_KEY is not set')
 
+        # OpenAI caches identical prompt prefixes automatically, so the
+        # stable context goes into the system message ahead of the request.
         payload = {
-            'model': settings.OPENAI_MODEL,
+            'model': self.model,
             'messages': [
-                {'role': 'system', 'content': system},
+                {'role': 'system', 'content': join_prompt(system, prefix)},
                 {'role': 'user', 'content': user},
             ],
         }
+        if stream:
+            payload['stream'] = True
+            payload['stream_options'] = {'include_usage': True}
         headers = {
             'Authorization': f"Bearer {settings.OPENAI_API_KEY}",
             'Content-Type': 'application/json',
         }
-        async with httpx.AsyncClient(timeout=90) as client:
-            r = await client.post('https://api.openai.com/v1/chat/completions', json=payload, headers=headers)
+        return payload, headers
+
+    @llm_retry
+    async def chat(self, *, system: str, user: str, prefix: str = '') -> str:
+        payload, headers = self._request(system, user, prefix)
+        client = self.client()
+        r = await client.post(URL, json=payload, headers=headers)
+        r.raise_for_status()
+        data = r.json()
+        self.record_openai_usage(data.get('usage'))
+        return data['choices'][0]['message']['content']
+
+    async def chat_stream(self, *, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        payload, headers = self._request(system, user, prefix, stream=True)
+        async with self.client().stream('POST', URL, json=payload, headers=headers) as r:
             r.raise_for_status()
-            data = r.json()
-            return data['choices'][0]['message']['content']
+            async for event in iter_sse_json(r):
+                self.record_openai_usage(event.get('usage'))
+                choices = event.get('choices') or []
+                text = choices[0].get('delta', {}).get('content') if choices else None
+                if text:
+                    yield text
@@ -1,35 +1,60 @@
 from __future__ import annotations
 
-import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import AsyncIterator
+
 from backend.core.settings import settings
-from .base import LLMProvider
+from .base import LLMProvider, ProviderConfigError, iter_sse_json, join_prompt, llm_retry
+
+API_VERSION = '2024-05-01'
 
 class WatsonxProvider(LLMProvider):
     name = 'watsonx'
+    params = {'decoding_method': 'greedy', 'max_new_tokens': 800}
+
+    @property
+    def model(self) -> str:
+        return settings.WATSONX_MODEL_ID
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=0.5, max=4))
-    async def chat(self, *, system: str, user: str) -> str:
+    def _request(self, system: str, user: str, prefix: str = '') -> tuple[dict, dict]:
         if not (settings.WATSONX_API_KEY and settings.WATSONX_URL and settings.WATSONX_PROJECT_ID):
-            raise RuntimeError('WATSONX_API_KEY/WATSONX_URL/WATSONX_PROJECT_ID must be set')
+            raise ProviderConfigError('WATSONX_API_KEY/WATSONX_URL/WATSONX_PROJECT_ID must be set')
 
         payload = {
-            'model_id': settings.WATSONX_MODEL_ID,
+            'model_id': self.model,
             'project_id': settings.WATSONX_PROJECT_ID,
-            'input': f"{system}\n\n{user}",
-            'parameters': {'decoding_method': 'greedy', 'max_new_tokens': 800},
+            'input': join_prompt(system, prefix, user),
+            'parameters': dict(self.params),
         }
         headers = {
             'Authorization': f"Bearer {settings.WATSONX_API_KEY}",
             'Content-Type': 'application/json',
         }
-        async with httpx.AsyncClient(timeout=90) as client:
-            r = await client.post(
-                f"{settings.WATSONX_URL.rstrip('/')}/ml/v1/text/generation?version=2024-05-01",
-                json=payload,
-                headers=headers,
+        return payload, headers
+
+    def _url(self, endpoint: str) -> str:
+        return f"{settings.WATSONX_URL.rstrip('/')}/ml/v1/text/{endpoint}?version={API_VERSION}"
+
+    @llm_retry
+    async def chat(self, *, system: str, user: str, prefix: str = '') -> str:
+        payload, headers = self._request(system, user, prefix)
+        client = self.client()
+        r = await client.post(self._url('generation'), json=payload, headers=headers)
+        r.raise_for_status()
+        data = r.json()
+        results = data.get('results', [])
+        if results:
+            self.record_usage(
+                prompt_tokens=results[0].get('input_token_count', 0),
+                completion_tokens=results[0].get('generated_token_count', 0),
             )
+        return (results[0].get('generated_text', '') if results else '') or ''
+
+    async def chat_stream(self, *, system: str, user: str, prefix: str = '') -> AsyncIterator[str]:
+        payload, headers = self._request(system, user, prefix)
+        async with self.client().stream('POST', self._url('generation_stream'), json=payload, headers=headers) as r:
             r.raise_for_status()
-            data = r.json()
-            results = data.get('results', [])
-            return (results[0].get('generated_text', '') if results else '') or ''
+            async for event in iter_sse_json(r):
+                results = event.get('results') or []
+                text = results[0].get('generated_text') if results else None
+                if text:
+                    yield text
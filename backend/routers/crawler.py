@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from backend.services.crawler import crawler
+
+router = APIRouter(prefix='/crawler', tags=['crawler'])
+
+class WatchTarget(BaseModel):
+    source: str  # greenhouse | lever | ashby
+    board: str
+    interval_seconds: float | None = None
+
+@router.get('/watchlist')
+async def watchlist():
+    return {'targets': [t.model_dump() for t in crawler.watchlist()]}
+
+@router.post('/watchlist')
+async def watch(targets: list[WatchTarget]):
+    """Add boards to the background crawl; each is crawled as soon as a slot is free."""
+    try:
+        added = [crawler.watch(t.source, t.board, t.interval_seconds) for t in targets]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'targets': [t.model_dump() for t in added]}
+
+@router.delete('/watchlist/{source}/{board}')
+async def unwatch(source: str, board: str):
+    if not crawler.unwatch(source, board):
+        raise HTTPException(status_code=404, detail='Board is not on the watchlist')
+    return {'ok': True}
+
+@router.post('/watchlist/{source}/{board}/crawl')
+async def crawl_now(source: str, board: str):
+    """Move a watched board to the front of the crawl queue."""
+    target = crawler.crawl_now(source, board)
+    if target is None:
+        raise HTTPException(status_code=404, detail='Board is not on the watchlist')
+    return target.model_dump()
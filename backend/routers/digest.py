@@ -5,6 +5,7 @@ from sqlmodel import select
 from backend.services.emailer import send_email
 from backend.core.db import session
 from backend.app.models.db import JobRecord
+from backend.services.postings import changes_since
 
 router = APIRouter(prefix='/digest', tags=['digest'])
 
@@ -19,3 +20,20 @@ async def email_digest(to_email: str, subject: str = 'JobCraft Digest'):
         return {'sent': True}
     except Exception as e:
         raise HTTPException(500, str(e))
+
+@router.post('/postings')
+async def postings_digest(to_email: str, since: int = 0, subject: str = 'JobCraft: new postings'):
+    """Email new and changed postings after change feed cursor ``since``.
+
+    Returns ``next``; pass it as ``since`` on the next call to only get
+    what appeared in between.
+    """
+    try:
+        rows = changes_since(since, 500, ['new', 'changed'])
+        if not rows:
+            return {'sent': False, 'count': 0, 'next': since}
+        lines = [f"{r.kind.upper()} | {r.company} — {r.title} | {r.url}" for r in rows]
+        await send_email(to_email, subject, "\n".join(lines))
+        return {'sent': True, 'count': len(rows), 'next': rows[-1].seq}
+    except Exception as e:
+        raise HTTPException(500, str(e))
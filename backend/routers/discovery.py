@@ -1,44 +1,103 @@
 from __future__ import annotations
 
+import json
+
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from backend.core.safety import parse_countries
 from backend.core.settings import settings
+from backend.services.boards import discover
+from backend.services.connectors.ashby import list_jobs as ashby_list
 from backend.services.connectors.greenhouse import list_jobs as gh_list
 from backend.services.connectors.lever import list_jobs as lever_list
-from backend.services.job_discovery import to_jobposting_from_greenhouse, to_jobposting_from_lever
+from backend.services.locations import country_codes
+from backend.services.postings import record_board
+from backend.services.job_discovery import to_jobposting_from_ashby, to_jobposting_from_greenhouse, to_jobposting_from_lever
 
 router = APIRouter(prefix='/discover', tags=['discovery'])
 
+def filter_countries(jobs: list[dict], countries: str) -> list[dict]:
+    """Keep jobs in a wanted country, plus those without a location or
+    remote without one. Countries were resolved when the job was normalized."""
+    wanted = set(country_codes(parse_countries(countries)))
+    if not wanted:
+        return jobs
+    filtered = []
+    for jp in jobs:
+        found = jp.get('countries') or ()
+        if not wanted.isdisjoint(found) or (not found and (jp.get('remote') or not jp.get('location'))):
+            filtered.append(jp)
+    return filtered
+
 @router.get('/greenhouse/{board_token}')
 async def greenhouse(board_token: str, countries: str = Query(default=settings.DEFAULT_COUNTRIES)):
     try:
-        jobs = await gh_list(board_token)
-        out = [to_jobposting_from_greenhouse(j).model_dump() for j in jobs]
-        wanted = set(parse_countries(countries))
-        if wanted:
-            filtered = []
-            for jp in out:
-                loc = (jp.get('location') or '').upper()
-                if any(c in loc for c in wanted) or not loc:
-                    filtered.append(jp)
-            out = filtered
-        return {'jobs': out[:100]}
+        jobs = [to_jobposting_from_greenhouse(j) for j in await gh_list(board_token)]
+        await record_board('greenhouse', board_token, jobs)
+        out = [j.model_dump() for j in jobs]
+        return {'jobs': filter_countries(out, countries)[:100]}
     except Exception as e:
         raise HTTPException(500, str(e))
 
 @router.get('/lever/{company}')
 async def lever(company: str, countries: str = Query(default=settings.DEFAULT_COUNTRIES)):
     try:
-        jobs = await lever_list(company)
-        out = [to_jobposting_from_lever(j, company).model_dump() for j in jobs]
-        wanted = set(parse_countries(countries))
-        if wanted:
-            filtered = []
-            for jp in out:
-                loc = (jp.get('location') or '').upper()
-                if any(c in loc for c in wanted) or not loc:
-                    filtered.append(jp)
-            out = filtered
-        return {'jobs': out[:100]}
+        jobs = [to_jobposting_from_lever(j, company) for j in await lever_list(company)]
+        await record_board('lever', company, jobs)
+        out = [j.model_dump() for j in jobs]
+        return {'jobs': filter_countries(out, countries)[:100]}
+    except Exception as e:
+        raise HTTPException(500, str(e))
+
+@router.get('/ashby/{org}')
+async def ashby(org: str, countries: str = Query(default=settings.DEFAULT_COUNTRIES)):
+    try:
+        jobs = [to_jobposting_from_ashby(j, org) for j in await ashby_list(org)]
+        await record_board('ashby', org, jobs)
+        out = [j.model_dump() for j in jobs]
+        return {'jobs': filter_countries(out, countries)[:100]}
     except Exception as e:
         raise HTTPException(500, str(e))
+
+class BoardTarget(BaseModel):
+    source: str  # greenhouse | lever | ashby
+    board: str  # Greenhouse board token, Lever company slug or Ashby job board name
+
+class BatchDiscovery(BaseModel):
+    targets: list[BoardTarget]
+    countries: str = settings.DEFAULT_COUNTRIES
+    max_jobs_per_board: int = 100
+
+@router.post('/batch')
+async def discover_batch(req: BatchDiscovery):
+    """Fetch many boards concurrently and stream the results as NDJSON.
+
+    One line per posting ({"type": "job", "source", "board", "job"}) and
+    one per board as it completes ({"type": "board", "ok", "count",
+    "error", "seconds"}), then {"type": "done"} with the totals. A board
+    that fails only gets ``ok: false`` on its own line.
+    """
+    if not req.targets:
+        raise HTTPException(status_code=400, detail='No targets given')
+    if len(req.targets) > settings.DISCOVERY_MAX_TARGETS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.DISCOVERY_MAX_TARGETS} targets per request")
+
+    async def lines():
+        boards = failed = total = 0
+        async for r in discover([(t.source, t.board) for t in req.targets]):
+            if r.ok:
+                await record_board(r.source, r.board, r.jobs)
+            jobs = filter_countries([j.model_dump() for j in r.jobs], req.countries)[:req.max_jobs_per_board]
+            for job in jobs:
+                yield json.dumps({'type': 'job', 'source': r.source, 'board': r.board, 'job': job}, ensure_ascii=False) + '\n'
+            boards += 1
+            failed += 0 if r.ok else 1
+            total += len(jobs)
+            yield json.dumps({
+                'type': 'board', 'source': r.source, 'board': r.board,
+                'ok': r.ok, 'count': len(jobs), 'error': r.error, 'seconds': r.seconds,
+            }) + '\n'
+        yield json.dumps({'type': 'done', 'boards': boards, 'failed': failed, 'jobs': total}) + '\n'
+
+    return StreamingResponse(lines(), media_type='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
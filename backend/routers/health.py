@@ -1,6 +1,88 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from backend.core.http_clients import llm_clients
+from backend.core.llm_cache import llm_cache
+from backend.core.metrics import REGISTRY
+from backend.core.router import router as llm_router
+from backend.core.warmup import model_warmer
+from backend.services.connectors.cache import connector_cache
+from backend.services.crawler import crawler
+from backend.services.cv_cache import cv_cache
+from backend.services.cv_parser import cv_pool
+from backend.services.packet_jobs import packet_jobs
+
 router = APIRouter()
 
 @router.get('/health')
 async def health():
     return {'status': 'ok'}
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of request, LLM, connector, CV and DB metrics."""
+    return PlainTextResponse(REGISTRY.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+@router.get('/health/pools')
+async def pools():
+    """Connection-pool usage of the shared LLM HTTP clients."""
+    return {'llm_clients': llm_clients.stats()}
+
+@router.get('/health/llm-cache')
+async def cache_stats():
+    """Hit/miss counters and size of the LLM response cache."""
+    return llm_cache.stats()
+
+@router.get('/health/llm-inflight')
+async def inflight_stats():
+    """In-flight LLM calls and how many requests were coalesced onto them."""
+    return llm_router.inflight.stats()
+
+@router.get('/health/llm-limits')
+async def limiter_stats():
+    """Per-provider in-flight slots, queue depth, wait times and 429 counts."""
+    return {name: lim.stats() for name, lim in llm_router.limiters.items()}
+
+@router.get('/health/llm-routing')
+async def routing_stats():
+    """EWMA latency/error rate per provider plus fallback and hedge counts."""
+    return llm_router.routing_stats()
+
+@router.get('/health/llm-breakers')
+async def breaker_stats():
+    """Circuit state per provider (closed, open or half_open)."""
+    return {name: b.stats() for name, b in llm_router.breakers.items()}
+
+@router.get('/health/llm-usage')
+async def usage_stats():
+    """Token usage per provider, including prompt tokens served from cache."""
+    return llm_router.usage_stats()
+
+@router.get('/health/llm-warmup')
+async def warmup_status():
+    """Local model warm-up: loaded/unloaded state and keep-alive pings."""
+    return await model_warmer.status()
+
+@router.get('/health/packet-jobs')
+async def packet_job_stats():
+    """Background packet workers, queue depth and live subscribers."""
+    return packet_jobs.stats()
+
+@router.get('/health/cv-pool')
+async def cv_pool_stats():
+    """CV parse pool: workers, queue depth, failures, timeouts and limits."""
+    return cv_pool.stats()
+
+@router.get('/health/cv-cache')
+async def cv_cache_stats():
+    """Hit/miss counters and size of the extracted CV text cache."""
+    return cv_cache.stats()
+
+@router.get('/health/connector-cache')
+async def connector_cache_stats():
+    """ATS connector HTTP cache: outcomes (fresh, 304s, unchanged bodies) and size."""
+    return connector_cache.stats()
+
+@router.get('/health/crawler')
+async def crawler_stats():
+    """Background crawler: scheduled and overdue boards, crawls in flight, outcomes."""
+    return crawler.stats()
@@ -1,15 +1,98 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
 from pathlib import Path
-import uuid
+from pydantic import BaseModel, TypeAdapter, ValidationError
+import hashlib
+from datetime import datetime
 
+from backend.app.models.db import JobRecord
+from backend.core.db import session
 from backend.core.settings import settings
-from backend.services.cv_parser import parse_cv
-from backend.crews.jobcraft_crew import build_application_packet
+from backend.core.sse import SSE_HEADERS, sse_event
+from backend.services.cv_cache import cv_cache
+from backend.services.cv_parser import FILETYPES, CVParseError, cv_pool
+from backend.services.matching import score_job
+from backend.services.packet_jobs import job_view, packet_jobs
+from backend.services.profiles import create_profile, delete_profile, get_profile, load_profile, match_text, profile_view
+from backend.crews.jobcraft_crew import (
+    PacketJob,
+    build_application_packet,
+    build_application_packets,
+    fit_packet_inputs,
+    stream_application_packet,
+)
 
 router = APIRouter(prefix='/jobcraft', tags=['jobcraft'])
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+async def _read_upload(cv_file: UploadFile) -> tuple[str, str]:
+    """(content key, text) of an uploaded CV; text comes from the cache when seen before."""
+    filetype = FILETYPES.get(Path(cv_file.filename or '').suffix.lower(), 'text')
+    data = bytearray()
+    digest = hashlib.sha256()
+    while chunk := await cv_file.read(UPLOAD_CHUNK_BYTES):
+        if len(data) + len(chunk) > settings.CV_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"CV is larger than {settings.CV_MAX_BYTES} bytes")
+        digest.update(chunk)
+        data += chunk
+    key = cv_cache.key(digest.hexdigest(), filetype)
+    if settings.CV_CACHE_ENABLED and (text := cv_cache.get(key)) is not None:
+        return key, text
+    try:
+        text = await cv_pool.parse(bytes(data), filetype)
+    except CVParseError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    if settings.CV_CACHE_ENABLED:
+        cv_cache.put(key, filetype, text)
+    return key, text
+
+def _stored_profile(profile_id: str):
+    record = get_profile(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail='Unknown profile')
+    return record
+
+async def _read_cv(cv_file: UploadFile | None, profile_id: str | None = None) -> str:
+    """CV text from a stored profile or an upload (one of them is required)."""
+    if profile_id:
+        return _stored_profile(profile_id).text
+    if cv_file is None:
+        raise HTTPException(status_code=400, detail='Send cv_file or profile_id')
+    return (await _read_upload(cv_file))[1]
+
+@router.post('/profiles')
+async def create_profile_from_cv(
+    cv_file: UploadFile = File(...),
+    use_llm: bool = Form(False),
+    provider: str = Form('ollabridge'),
+):
+    """Parse a CV into a stored profile and return it with its ``profile_id``.
+
+    Rule-based by default; ``use_llm`` adds one LLM pass to fill in and
+    clean up the fields. The same CV uploaded again returns the stored profile.
+    """
+    try:
+        key, text = await _read_upload(cv_file)
+        record = await create_profile(key, text, provider=provider, use_llm=use_llm)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return profile_view(record)
+
+@router.get('/profiles/{profile_id}')
+async def get_stored_profile(profile_id: str):
+    return profile_view(_stored_profile(profile_id))
+
+@router.delete('/profiles/{profile_id}')
+async def delete_stored_profile(profile_id: str):
+    if not delete_profile(profile_id):
+        raise HTTPException(status_code=404, detail='Unknown profile')
+    return {'ok': True}
+
 @router.post('/packet')
 async def create_packet(
     provider: str = Form('ollabridge'),
@@ -17,14 +100,233 @@ async def create_packet(
     company: str = Form(...),
     job_description: str = Form(...),
     country: str = Form('IT'),
-    cv_file: UploadFile = File(...),
+    cv_file: UploadFile | None = File(None),
+    profile_id: str | None = Form(None),
+    no_cache: bool = Form(False),
+    refresh: bool = Form(False),
+):
+    try:
+        profile_text = await _read_cv(cv_file, profile_id)
+        result = await build_application_packet(provider, profile_text, job_title, company, job_description, country=country, no_cache=no_cache, refresh=refresh)
+        return {'packet_markdown': result.markdown, 'dropped': result.dropped}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post('/packet/stream')
+async def stream_packet(
+    provider: str = Form('ollabridge'),
+    job_title: str = Form(...),
+    company: str = Form(...),
+    job_description: str = Form(...),
+    country: str = Form('IT'),
+    cv_file: UploadFile | None = File(None),
+    profile_id: str | None = Form(None),
+    no_cache: bool = Form(False),
+    refresh: bool = Form(False),
+):
+    """Server-sent events variant of /packet.
+
+    Emits ``token`` events ({"text": ...}) as the model generates, then a
+    single ``done`` event with the full markdown and anything ``dropped``
+    to fit the context window, or ``error`` on failure.
+    """
+    try:
+        profile_text = await _read_cv(cv_file, profile_id)
+        inputs = fit_packet_inputs(provider, profile_text, job_title, company, job_description, country)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        parts: list[str] = []
+        try:
+            async for chunk in stream_application_packet(provider, profile_text, job_title, company, job_description, country=country, no_cache=no_cache, refresh=refresh, inputs=inputs):
+                parts.append(chunk)
+                yield sse_event('token', {'text': chunk})
+        except Exception as e:
+            yield sse_event('error', {'detail': str(e)})
+            return
+        yield sse_event('done', {'packet_markdown': ''.join(parts), 'dropped': inputs.dropped})
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers=SSE_HEADERS)
+
+@router.post('/packet/jobs', status_code=202)
+async def submit_packet_job(
+    provider: str = Form('ollabridge'),
+    job_title: str = Form(...),
+    company: str = Form(...),
+    job_description: str = Form(...),
+    country: str = Form('IT'),
+    cv_file: UploadFile | None = File(None),
+    profile_id: str | None = Form(None),
+    no_cache: bool = Form(False),
+    refresh: bool = Form(False),
 ):
+    """Queue a packet for background generation and return its job id at once.
+
+    Poll ``GET /packet/jobs/{id}`` or subscribe to ``/packet/jobs/{id}/events``.
+    """
     try:
-        tmp = settings.DATA_DIR / f"cv_{uuid.uuid4()}_{cv_file.filename}"
-        with tmp.open('wb') as f:
-            f.write(await cv_file.read())
-        profile_text = parse_cv(tmp)
-        result = await build_application_packet(provider, profile_text, job_title, company, job_description, country=country)
-        return {'packet_markdown': result.markdown}
+        profile_text = await _read_cv(cv_file, profile_id)
+        job = packet_jobs.submit(provider, profile_text, job_title, company, job_description, country=country, no_cache=no_cache, refresh=refresh)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {'job_id': job.id, 'status': job.status}
+
+def _packet_job(job_id: str):
+    job = packet_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Unknown packet job')
+    return job
+
+@router.get('/packet/jobs/{job_id}')
+async def get_packet_job(job_id: str):
+    return job_view(_packet_job(job_id))
+
+@router.get('/packet/jobs/{job_id}/events')
+async def packet_job_events(job_id: str):
+    """Server-sent events for a queued packet.
+
+    Emits ``status`` with the current state, ``token`` chunks while it
+    generates, then ``done`` with the job (markdown included) or ``error``.
+    A finished job gets its final event straight away.
+    """
+    _packet_job(job_id)
+
+    async def events():
+        async for event, data in packet_jobs.events(job_id):
+            yield sse_event(event, data)
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers=SSE_HEADERS)
+
+@router.post('/packet/jobs/{job_id}/cancel')
+async def cancel_packet_job(job_id: str):
+    _packet_job(job_id)
+    return job_view(packet_jobs.cancel(job_id))
+
+class BatchJob(BaseModel):
+    """One job in a batch request."""
+    job_title: str
+    company: str
+    job_description: str
+    country: str | None = None
+    id: str | None = None
+
+def _tracker_jobs(ids: list[str], country: str) -> list[PacketJob]:
+    with session() as s:
+        rows = {i: s.get(JobRecord, i) for i in ids}
+    missing = [i for i, r in rows.items() if r is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Unknown tracker job id(s): {', '.join(missing)}")
+    # Tracked jobs keep no description; give the model what we have.
+    return [
+        PacketJob(
+            job_title=r.title,
+            company=r.company,
+            job_desc=f"{r.title} at {r.company}" + (f" ({r.location})" if r.location else '') + f"\nPosting: {r.url}",
+            country=r.country or country,
+            ref=r.id,
+        )
+        for r in rows.values()
+    ]
+
+def _job_list(jobs: str, tracker_ids: str, country: str) -> list[PacketJob]:
+    """Jobs from a JSON list of BatchJob plus comma-separated tracker ids."""
+    try:
+        items = TypeAdapter(list[BatchJob]).validate_json(jobs or '[]')
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid jobs payload: {e}")
+    batch = [
+        PacketJob(j.job_title, j.company, j.job_description, country=j.country or country, ref=j.id)
+        for j in items
+    ]
+    ids = [i.strip() for i in tracker_ids.split(',') if i.strip()]
+    if ids:
+        batch.extend(_tracker_jobs(ids, country))
+    if not batch:
+        raise HTTPException(status_code=400, detail='No jobs given')
+    return batch
+
+@router.post('/packets/batch')
+async def batch_packets(
+    provider: str = Form('ollabridge'),
+    jobs: str = Form('[]'),
+    tracker_ids: str = Form(''),
+    country: str = Form('IT'),
+    cv_file: UploadFile | None = File(None),
+    profile_id: str | None = Form(None),
+    no_cache: bool = Form(False),
+    refresh: bool = Form(False),
+):
+    """Generate packets for one CV against many jobs.
+
+    ``jobs`` is a JSON list of {job_title, company, job_description,
+    country?, id?}; ``tracker_ids`` is a comma-separated list of tracked
+    job ids. The CV is parsed once, or taken from a stored ``profile_id``.
+    Results stream back as server-sent events in completion order: one
+    ``result`` event per job (with ``error`` set if that job failed), then
+    ``done`` with the totals.
+    """
+    batch = _job_list(jobs, tracker_ids, country)
+    if len(batch) > settings.PACKET_BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.PACKET_BATCH_MAX_JOBS} jobs per batch")
+
+    try:
+        profile_text = await _read_cv(cv_file, profile_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        failed = 0
+        async for r in build_application_packets(provider, profile_text, batch, no_cache=no_cache, refresh=refresh):
+            failed += 0 if r.ok else 1
+            yield sse_event('result', {
+                'index': r.index,
+                'id': r.ref,
+                'job_title': r.job_title,
+                'company': r.company,
+                'ok': r.ok,
+                'packet_markdown': r.markdown,
+                'error': r.error,
+                'dropped': r.dropped,
+            })
+        yield sse_event('done', {'total': len(batch), 'succeeded': len(batch) - failed, 'failed': failed})
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers=SSE_HEADERS)
+
+@router.post('/match')
+async def match_jobs(
+    profile_id: str = Form(...),
+    jobs: str = Form('[]'),
+    tracker_ids: str = Form(''),
+    country: str = Form('IT'),
+):
+    """Score jobs against a stored profile (roles, skills and summary), best first.
+
+    Takes the same ``jobs`` / ``tracker_ids`` as /packets/batch; tracked
+    jobs get their ``score`` updated.
+    """
+    text = match_text(load_profile(_stored_profile(profile_id)))
+    batch = _job_list(jobs, tracker_ids, country)
+    scores = [
+        {'id': j.ref, 'job_title': j.job_title, 'company': j.company, 'score': score_job(text, f"{j.job_title}\n{j.job_desc}")}
+        for j in batch
+    ]
+    tracked = {i.strip() for i in tracker_ids.split(',') if i.strip()}
+    if tracked:
+        with session() as s:
+            for item in scores:
+                if item['id'] in tracked:
+                    record = s.get(JobRecord, item['id'])
+                    record.score = item['score']
+                    record.updated_at = datetime.utcnow()
+                    s.add(record)
+            s.commit()
+    return {'profile_id': profile_id, 'jobs': sorted(scores, key=lambda x: x['score'], reverse=True)}
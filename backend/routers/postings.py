@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Query
+from sqlmodel import select
+
+from backend.app.models.db import PostingRecord
+from backend.core.db import session
+from backend.services.postings import changes_since
+
+router = APIRouter(prefix='/postings', tags=['postings'])
+
+@router.get('')
+async def list_postings(
+    source: str | None = None,
+    board: str | None = None,
+    status: str = 'active',
+    min_score: int | None = None,
+    limit: int = Query(default=100, le=1000),
+):
+    """Synced postings, best scored first."""
+    q = select(PostingRecord).where(PostingRecord.status == status)
+    if source:
+        q = q.where(PostingRecord.source == source)
+    if board:
+        q = q.where(PostingRecord.board == board)
+    if min_score is not None:
+        q = q.where(PostingRecord.score >= min_score)
+    q = q.order_by(PostingRecord.score.desc(), PostingRecord.updated_at.desc()).limit(limit)
+    with session() as s:
+        return {'postings': [p.model_dump(exclude={'description'}) for p in s.exec(q).all()]}
+
+@router.get('/changes')
+async def changes(since: int = 0, limit: int = Query(default=500, le=5000), kinds: str = ''):
+    """The change feed after cursor ``since``; pass ``next`` back to continue."""
+    rows = changes_since(since, limit, [k for k in kinds.split(',') if k] or None)
+    return {'changes': [r.model_dump() for r in rows], 'next': rows[-1].seq if rows else since}
@@ -164,8 +164,8 @@ async def test_provider_connection(provider_id: str):
 
     settings = get_settings()
 
-    # Try to list models as a connection test
-    models, error = await list_models_for_provider(provider_enum, settings)
+    # Try to list models as a connection test (bypassing the catalog cache)
+    models, error = await list_models_for_provider(provider_enum, settings, refresh=True)
 
     if error:
         return {
@@ -0,0 +1,134 @@
+"""Fetch many ATS boards at once.
+
+``discover`` takes (source, board) targets and yields one ``BoardResult``
+per board as it completes. Fetches share the connectors' pooled client
+and are bounded twice: DISCOVERY_CONCURRENCY overall and
+DISCOVERY_PER_HOST per ATS host, with targets interleaved across hosts
+so one big source cannot starve the others. A failing board is reported
+in its result instead of failing the batch.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.app.schemas.job import JobPosting
+from backend.core.settings import settings
+from backend.services.connectors.ashby import list_jobs as ashby_list
+from backend.services.connectors.greenhouse import list_jobs as gh_list
+from backend.services.connectors.lever import list_jobs as lever_list
+from backend.services.job_discovery import (
+    to_jobposting_from_ashby,
+    to_jobposting_from_greenhouse,
+    to_jobposting_from_lever,
+)
+
+
+async def _greenhouse(board: str, revalidate: bool = False) -> List[JobPosting]:
+    return [to_jobposting_from_greenhouse(j) for j in await gh_list(board, revalidate)]
+
+
+async def _lever(company: str, revalidate: bool = False) -> List[JobPosting]:
+    return [to_jobposting_from_lever(j, company) for j in await lever_list(company, revalidate)]
+
+
+async def _ashby(org: str, revalidate: bool = False) -> List[JobPosting]:
+    return [to_jobposting_from_ashby(j, org) for j in await ashby_list(org, revalidate)]
+
+
+Fetcher = Callable[[str, bool], Awaitable[List[JobPosting]]]
+
+# source -> (API host, fetch + normalize)
+SOURCES: Dict[str, Tuple[str, Fetcher]] = {
+    'greenhouse': ('boards-api.greenhouse.io', _greenhouse),
+    'lever': ('api.lever.co', _lever),
+    'ashby': ('api.ashbyhq.com', _ashby),
+}
+
+
+@dataclass
+class BoardResult:
+    source: str
+    board: str
+    jobs: List[JobPosting] = field(default_factory=list)
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _source(source: str) -> Tuple[str, Fetcher]:
+    entry = SOURCES.get(source)
+    if entry is None:
+        raise ValueError(f"Unknown source '{source}' (expected one of: {', '.join(SOURCES)})")
+    return entry
+
+
+def host_of(source: str) -> str:
+    return _source(source)[0]
+
+
+async def fetch_board(source: str, board: str, revalidate: bool = False) -> List[JobPosting]:
+    """Normalized postings of one board; ``revalidate`` bypasses the cache TTL."""
+    return await _source(source)[1](board, revalidate)
+
+
+class HostLimiter:
+    """A global cap on concurrent fetches plus a smaller cap per host."""
+
+    def __init__(self, total: int, per_host: int):
+        self._total = asyncio.Semaphore(max(1, total))
+        self._per_host = max(1, per_host)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host(self, name: str) -> asyncio.Semaphore:
+        sem = self._hosts.get(name)
+        if sem is None:
+            sem = self._hosts[name] = asyncio.Semaphore(self._per_host)
+        return sem
+
+    async def run(self, host: str, fn: Callable[[], Awaitable]) -> object:
+        # Host slot first, so a task queued behind a busy host holds no global slot.
+        async with self.host(host), self._total:
+            return await fn()
+
+
+def interleave(targets: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Round-robin targets across hosts: gh, lever, ashby, gh, lever, ..."""
+    by_host: Dict[str, deque] = defaultdict(deque)
+    for source, board in targets:
+        by_host[SOURCES[source][0] if source in SOURCES else source].append((source, board))
+    out: List[Tuple[str, str]] = []
+    queues = list(by_host.values())
+    while queues:
+        for q in queues:
+            out.append(q.popleft())
+        queues = [q for q in queues if q]
+    return out
+
+
+async def discover(targets: Iterable[Tuple[str, str]], limiter: Optional[HostLimiter] = None) -> AsyncIterator[BoardResult]:
+    """Fetch every (source, board) concurrently, yielding results as they complete."""
+    limiter = limiter or HostLimiter(settings.DISCOVERY_CONCURRENCY, settings.DISCOVERY_PER_HOST)
+
+    async def one(source: str, board: str) -> BoardResult:
+        started = time.perf_counter()
+        try:
+            jobs = await limiter.run(host_of(source), lambda: fetch_board(source, board))
+            return BoardResult(source, board, jobs, seconds=round(time.perf_counter() - started, 3))
+        except Exception as e:
+            return BoardResult(source, board, error=f"{type(e).__name__}: {e}", seconds=round(time.perf_counter() - started, 3))
+
+    tasks = [asyncio.ensure_future(one(s, b)) for s, b in interleave(targets)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: stop the fetches still queued or running.
+        for t in tasks:
+            t.cancel()
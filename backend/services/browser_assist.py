@@ -5,8 +5,6 @@ from __future__ import annotations
 - Only opens allowlisted job/app pages
 """
 
-from playwright.async_api import async_playwright
-from playwright_stealth import stealth_async
 from backend.core.settings import settings
 from backend.core.safety import is_domain_allowed
 
@@ -14,6 +12,10 @@ async def open_in_browser(url: str) -> str:
     if not is_domain_allowed(url, settings.ALLOWLIST_JOB_DOMAINS):
         raise ValueError('Domain not allowlisted for browser assist')
 
+    # The browser stack is heavy to import; load it only when a page is opened.
+    from playwright.async_api import async_playwright
+    from playwright_stealth import stealth_async
+
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page(viewport={'width': 1280, 'height': 800})
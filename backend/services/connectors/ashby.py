@@ -1,8 +1,13 @@
 from __future__ import annotations
-import httpx
+
+from backend.services.connectors.cache import connector_cache
+
+# Ashby public posting API: https://api.ashbyhq.com/posting-api/job-board/{org}?includeCompensation=true
+
+async def list_jobs(org: str, revalidate: bool = False) -> list[dict]:
+    url = f"https://api.ashbyhq.com/posting-api/job-board/{org}?includeCompensation=true"
+    data = (await connector_cache.get(url, 'ashby', revalidate)).json()
+    return [j for j in data.get('jobs', []) if j.get('isListed', True)]
 
 async def fetch(url: str) -> str:
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.get(url)
-        r.raise_for_status()
-        return r.text
+    return (await connector_cache.get(url, 'ashby')).text
@@ -0,0 +1,246 @@
+"""Conditional-request cache shared by the ATS connectors.
+
+Two layers:
+
+- in process, a response is reused for CONNECTOR_CACHE_TTL_SECONDS, then
+  served stale for up to CONNECTOR_CACHE_STALE_SECONDS more while one
+  background request revalidates it (stale-while-revalidate);
+- on disk (``connector_cache.sqlite`` under ``DATA_DIR``), the body is
+  kept with its ETag, Last-Modified and SHA-256 digest, so revalidation
+  sends ``If-None-Match`` / ``If-Modified-Since`` and a 304 is answered
+  from the stored body, across restarts too.
+
+A 200 whose digest matches the stored body counts as unchanged and keeps
+the already decoded JSON. Concurrent requests for one URL share a fetch.
+Fetch latency is recorded per source and cache result, so near-instant
+hits do not dilute the latency of requests that went upstream.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from backend.core.metrics import CONNECTOR_CACHE_RESULTS, CONNECTOR_ERRORS, CONNECTOR_FETCH_SECONDS
+from backend.core.settings import settings
+from backend.services.connectors.http import client
+
+_UNSET = object()
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    content: bytes
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0  # wall clock of the last successful (re)validation
+    _json: Any = field(default=_UNSET, repr=False)
+
+    def json(self) -> Any:
+        """The decoded body, decoded once per distinct body."""
+        if self._json is _UNSET:
+            self._json = json.loads(self.content)
+        return self._json
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+
+class ConnectorCache:
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[CachedResponse, float]] = {}  # url -> (response, monotonic checked_at)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.counts: Dict[str, int] = {}
+
+    # -- disk ----------------------------------------------------------------
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self._path or settings.DATA_DIR / 'connector_cache.sqlite'
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS http_cache ('
+                ' url TEXT PRIMARY KEY,'
+                ' etag TEXT,'
+                ' last_modified TEXT,'
+                ' digest TEXT NOT NULL,'
+                ' body BLOB NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' fetched_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_http_cache_fetched ON http_cache (fetched_at)')
+            self._conn = conn
+        return self._conn
+
+    def _load(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db().execute(
+                'SELECT etag, last_modified, digest, body, fetched_at FROM http_cache WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, digest, body, fetched_at = row
+        return CachedResponse(url, zlib.decompress(body), digest, etag, last_modified, fetched_at)
+
+    def _store(self, resp: CachedResponse, body_changed: bool) -> None:
+        with self._lock:
+            db = self._db()
+            if body_changed:
+                body = zlib.compress(resp.content)
+                db.execute(
+                    'INSERT OR REPLACE INTO http_cache (url, etag, last_modified, digest, body, size, fetched_at)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (resp.url, resp.etag, resp.last_modified, resp.digest, body, len(body), resp.fetched_at),
+                )
+                self._evict(db)
+            else:
+                db.execute(
+                    'UPDATE http_cache SET etag = ?, last_modified = ?, fetched_at = ? WHERE url = ?',
+                    (resp.etag, resp.last_modified, resp.fetched_at, resp.url),
+                )
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+        if total <= settings.CONNECTOR_CACHE_MAX_BYTES:
+            return
+        for url, size in db.execute('SELECT url, size FROM http_cache ORDER BY fetched_at ASC').fetchall():
+            if total <= settings.CONNECTOR_CACHE_MAX_BYTES:
+                break
+            db.execute('DELETE FROM http_cache WHERE url = ?', (url,))
+            total -= size
+
+    # -- fetching ------------------------------------------------------------
+
+    def _remember(self, url: str, resp: CachedResponse, checked_at: float) -> Tuple[CachedResponse, float]:
+        self._memory.pop(url, None)
+        self._memory[url] = entry = (resp, checked_at)
+        while len(self._memory) > settings.CONNECTOR_CACHE_MEMORY_ENTRIES:
+            del self._memory[next(iter(self._memory))]  # oldest first
+        return entry
+
+    def _count(self, result: str) -> None:
+        self.counts[result] = self.counts.get(result, 0) + 1
+        CONNECTOR_CACHE_RESULTS.inc(result)
+
+    async def _revalidate(self, url: str) -> Tuple[CachedResponse, str]:
+        known = self._memory.get(url, (None, 0.0))[0] or await asyncio.to_thread(self._load, url)
+        headers = {}
+        if known is not None:
+            if known.etag:
+                headers['If-None-Match'] = known.etag
+            if known.last_modified:
+                headers['If-Modified-Since'] = known.last_modified
+        r = await client().get(url, headers=headers)
+        if r.status_code == 304 and known is not None:
+            resp, changed, result = known, False, 'not_modified'
+            resp.etag = r.headers.get('etag') or known.etag
+            resp.last_modified = r.headers.get('last-modified') or known.last_modified
+        else:
+            r.raise_for_status()
+            digest = hashlib.sha256(r.content).hexdigest()
+            if known is not None and known.digest == digest:
+                resp, changed, result = known, False, 'unchanged'
+            else:
+                resp, changed, result = CachedResponse(url, r.content, digest), True, 'changed' if known else 'miss'
+            resp.etag = r.headers.get('etag')
+            resp.last_modified = r.headers.get('last-modified')
+        resp.fetched_at = time.time()
+        self._remember(url, resp, time.monotonic())
+        await asyncio.to_thread(self._store, resp, changed)
+        self._count(result)
+        return resp, result
+
+    def _refresh(self, url: str) -> asyncio.Task:
+        """Start (or join) the revalidation of ``url``."""
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._revalidate(url))
+            self._inflight[url] = task
+
+            def _done(t: asyncio.Task) -> None:
+                if self._inflight.get(url) is t:
+                    del self._inflight[url]
+                if not t.cancelled():
+                    t.exception()  # a failed background revalidation is not an unhandled error
+
+            task.add_done_callback(_done)
+        return task
+
+    async def get(self, url: str, source: str, revalidate: bool = False) -> CachedResponse:
+        """GET ``url`` for connector ``source`` through the cache; ``revalidate``
+        always asks upstream (conditionally), e.g. for the background crawler."""
+        started = time.perf_counter()
+        result = 'error'
+        try:
+            resp, result = await self._get(url, revalidate)
+            return resp
+        except asyncio.CancelledError:
+            result = 'cancelled'
+            raise
+        except Exception:
+            CONNECTOR_ERRORS.inc(source)
+            raise
+        finally:
+            CONNECTOR_FETCH_SECONDS.observe(time.perf_counter() - started, source, result)
+
+    async def _get(self, url: str, revalidate: bool) -> Tuple[CachedResponse, str]:
+        if not settings.CONNECTOR_CACHE_ENABLED:
+            r = await client().get(url)
+            r.raise_for_status()
+            return CachedResponse(url, r.content, hashlib.sha256(r.content).hexdigest(), fetched_at=time.time()), 'uncached'
+
+        if revalidate:
+            return await asyncio.shield(self._refresh(url))
+        ttl, stale = settings.CONNECTOR_CACHE_TTL_SECONDS, settings.CONNECTOR_CACHE_STALE_SECONDS
+        entry = self._memory.get(url)
+        if entry is None:
+            stored = await asyncio.to_thread(self._load, url)
+            if stored is not None:
+                # Age the in-process entry by how long ago it was last validated.
+                age = max(0.0, time.time() - stored.fetched_at)
+                entry = self._remember(url, stored, time.monotonic() - age)
+        if entry is not None:
+            resp, checked_at = entry
+            age = time.monotonic() - checked_at
+            if age < ttl:
+                self._count('fresh')
+                return resp, 'fresh'
+            if age < ttl + stale:
+                self._count('stale')
+                self._refresh(url)
+                return resp, 'stale'
+        # Shield the shared fetch so one caller going away does not cancel it for the rest.
+        return await asyncio.shield(self._refresh(url))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache').fetchone()
+        return {
+            'enabled': settings.CONNECTOR_CACHE_ENABLED,
+            'results': dict(self.counts),
+            'memory_entries': len(self._memory),
+            'revalidating': len(self._inflight),
+            'disk_entries': entries,
+            'disk_bytes': size,
+            'max_bytes': settings.CONNECTOR_CACHE_MAX_BYTES,
+            'ttl_seconds': settings.CONNECTOR_CACHE_TTL_SECONDS,
+            'stale_seconds': settings.CONNECTOR_CACHE_STALE_SECONDS,
+        }
+
+
+connector_cache = ConnectorCache()
@@ -1,12 +1,15 @@
 from __future__ import annotations
-import httpx
+
+from backend.services.connectors.cache import connector_cache
 
 # Greenhouse job boards: https://boards-api.greenhouse.io/v1/boards/{board_token}/jobs
 
-async def list_jobs(board_token: str) -> list[dict]:
+async def list_jobs(board_token: str, revalidate: bool = False) -> list[dict]:
     url = f"https://boards-api.greenhouse.io/v1/boards/{board_token}/jobs"
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.get(url)
-        r.raise_for_status()
-        data = r.json()
-        return data.get('jobs', [])
+    data = (await connector_cache.get(url, 'greenhouse', revalidate)).json()
+    return data.get('jobs', [])
+
+async def get_job(board_token: str, job_id: str) -> dict:
+    """One posting with its ``content`` (HTML description)."""
+    url = f"https://boards-api.greenhouse.io/v1/boards/{board_token}/jobs/{job_id}"
+    return (await connector_cache.get(url, 'greenhouse')).json()
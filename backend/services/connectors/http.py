@@ -0,0 +1,35 @@
+"""Shared HTTP client for the ATS connectors.
+
+All connectors go through one pooled ``httpx.AsyncClient`` so fetching
+hundreds of boards reuses connections to each ATS host instead of
+opening a new TLS session per board. Closed on app shutdown.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import httpx
+
+from backend.core.settings import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.CONNECTOR_TIMEOUT_SECONDS, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.DISCOVERY_CONCURRENCY,
+                max_keepalive_connections=settings.DISCOVERY_CONCURRENCY,
+            ),
+        )
+    return _client
+
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
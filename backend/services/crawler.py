@@ -0,0 +1,305 @@
+"""Background crawler for the job board watchlist.
+
+Watched boards are ``CrawlTarget`` rows; the schedule survives restarts.
+Each board has its own interval, halved when a crawl finds the board
+changed and stretched by half when it did not (within
+CRAWLER_MIN/MAX_INTERVAL_SECONDS), with +/- CRAWLER_JITTER so boards do
+not fall into lockstep. A heap ordered by next due time decides what runs
+next; a board that changes often comes due sooner than a quiet one.
+
+Crawls go through the connector cache (a conditional request, mostly
+answered by a 304), so the discovery endpoints find boards already cached
+locally. Each successful crawl is synced into the postings table, and
+new or changed postings get their description and score there. At most
+CRAWLER_CONCURRENCY crawls run at once, CRAWLER_PER_HOST
+per ATS host, and requests to one host are spaced by at least
+CRAWLER_HOST_MIN_INTERVAL_SECONDS. Failures back off exponentially.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import json
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import select
+
+from backend.app.models.db import CrawlTarget
+from backend.app.schemas.job import JobPosting
+from backend.core.db import session
+from backend.core.settings import settings
+from backend.services.boards import HostLimiter, fetch_board, host_of
+from backend.services.postings import record_board
+
+
+def target_id(source: str, board: str) -> str:
+    return f"{source}:{board}"
+
+
+def postings_digest(jobs: Iterable[JobPosting]) -> str:
+    rows = sorted((j.id, j.title, j.location or '', j.url, j.posted_at or '') for j in jobs)
+    return hashlib.sha256(json.dumps(rows).encode('utf-8')).hexdigest()
+
+
+def _jittered(interval: float) -> float:
+    j = settings.CRAWLER_JITTER
+    return interval * random.uniform(1 - j, 1 + j)
+
+
+def _clamp(interval: float) -> float:
+    return min(settings.CRAWLER_MAX_INTERVAL_SECONDS, max(settings.CRAWLER_MIN_INTERVAL_SECONDS, interval))
+
+
+def _backoff(failures: int) -> float:
+    return min(settings.CRAWLER_MAX_INTERVAL_SECONDS, settings.CRAWLER_MIN_INTERVAL_SECONDS * 2 ** min(failures, 10))
+
+
+class Crawler:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}  # target id -> the heap entry that is current
+        self._running: Dict[str, asyncio.Task] = {}
+        self._limiter = HostLimiter(settings.CRAWLER_CONCURRENCY, settings.CRAWLER_PER_HOST)
+        self._host_next: Dict[str, float] = {}
+        self.crawled = 0
+        self.changed = 0
+        self.failed = 0
+
+    # -- watchlist -----------------------------------------------------------
+
+    def _schedule(self, tid: str, due: float) -> None:
+        self._due[tid] = due
+        heapq.heappush(self._heap, (due, tid))
+        if self._wake is not None:
+            self._wake.set()
+
+    def watch(self, source: str, board: str, interval_seconds: Optional[float] = None) -> CrawlTarget:
+        """Add (or re-enable) a board; it is crawled as soon as a slot is free."""
+        host_of(source)  # unknown sources fail here, not in the background
+        tid = target_id(source, board)
+        with session() as s:
+            target = s.get(CrawlTarget, tid)
+            if target is None:
+                target = CrawlTarget(id=tid, source=source, board=board, interval_seconds=0.0)
+            target.enabled = True
+            target.interval_seconds = _clamp(interval_seconds or target.interval_seconds or settings.CRAWLER_DEFAULT_INTERVAL_SECONDS)
+            target.next_due_at = time.time()
+            s.add(target)
+            s.commit()
+            s.refresh(target)
+        self._schedule(tid, target.next_due_at)
+        return target
+
+    def unwatch(self, source: str, board: str) -> bool:
+        tid = target_id(source, board)
+        with session() as s:
+            target = s.get(CrawlTarget, tid)
+            if target is None:
+                return False
+            s.delete(target)
+            s.commit()
+        self._due.pop(tid, None)
+        return True
+
+    def crawl_now(self, source: str, board: str) -> Optional[CrawlTarget]:
+        tid = target_id(source, board)
+        with session() as s:
+            target = s.get(CrawlTarget, tid)
+            if target is None:
+                return None
+            target.next_due_at = time.time()
+            s.add(target)
+            s.commit()
+            s.refresh(target)
+        self._schedule(tid, target.next_due_at)
+        return target
+
+    def watchlist(self) -> List[CrawlTarget]:
+        with session() as s:
+            return list(s.exec(select(CrawlTarget).order_by(CrawlTarget.next_due_at)).all())
+
+    # -- crawling ------------------------------------------------------------
+
+    async def _polite(self, host: str) -> None:
+        """Wait for this host's next request slot (slots are reserved, then slept for)."""
+        now = time.monotonic()
+        slot = max(now, self._host_next.get(host, 0.0))
+        self._host_next[host] = slot + settings.CRAWLER_HOST_MIN_INTERVAL_SECONDS
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def crawl(self, tid: str) -> Optional[CrawlTarget]:
+        """Crawl one board now and store its outcome and next due time."""
+        target = self._get(tid)
+        if target is None or not target.enabled:
+            return None
+        host = host_of(target.source)
+        error = None
+        jobs: List[JobPosting] = []
+        try:
+            async def fetch():
+                await self._polite(host)
+                return await fetch_board(target.source, target.board, revalidate=True)
+
+            jobs = await self._limiter.run(host, fetch)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if error is None:
+            await record_board(target.source, target.board, jobs, enrich=True)
+
+        now = time.time()
+        with session() as s:
+            target = s.get(CrawlTarget, tid)
+            if target is None:
+                return None  # unwatched while crawling
+            target.crawls += 1
+            target.last_crawled_at = now
+            if error:
+                self.failed += 1
+                target.failures += 1
+                target.last_error = error
+                delay = _backoff(target.failures)
+            else:
+                self.crawled += 1
+                digest = postings_digest(jobs)
+                changed = target.digest is not None and digest != target.digest
+                if changed:
+                    self.changed += 1
+                    target.changes += 1
+                    target.last_changed_at = now
+                    target.interval_seconds = _clamp(target.interval_seconds * 0.5)
+                elif target.digest is not None:
+                    target.interval_seconds = _clamp(target.interval_seconds * 1.5)
+                target.digest = digest
+                target.job_count = len(jobs)
+                target.failures = 0
+                target.last_error = None
+                delay = target.interval_seconds
+            target.next_due_at = now + _jittered(delay)
+            s.add(target)
+            s.commit()
+            s.refresh(target)
+        return target
+
+    def _failed(self, tid: str, error: str) -> Optional[float]:
+        """Record a crawl that raised (e.g. the database); return its next due time."""
+        self.failed += 1
+        failures = 1
+        try:
+            with session() as s:
+                target = s.get(CrawlTarget, tid)
+                if target is None:
+                    return None
+                target.failures += 1
+                target.last_error = error
+                failures = target.failures
+                target.next_due_at = time.time() + _jittered(_backoff(failures))
+                s.add(target)
+                s.commit()
+                return target.next_due_at
+        except Exception:
+            return time.time() + _jittered(_backoff(failures))
+
+    async def _crawl_and_reschedule(self, tid: str) -> None:
+        due = None
+        try:
+            target = await self.crawl(tid)
+            due = target.next_due_at if target is not None else None
+        except Exception as e:
+            print(f"Warning: crawl of {tid} failed: {e}")
+            due = self._failed(tid, f"{type(e).__name__}: {e}")
+        finally:
+            self._running.pop(tid, None)
+        if due is not None:
+            self._schedule(tid, due)
+
+    def _get(self, tid: str) -> Optional[CrawlTarget]:
+        with session() as s:
+            return s.get(CrawlTarget, tid)
+
+    def _dispatch(self) -> Optional[float]:
+        """Start every due crawl there is room for; return seconds until the next one."""
+        now = time.time()
+        while self._heap and len(self._running) < settings.CRAWLER_CONCURRENCY:
+            due, tid = self._heap[0]
+            if self._due.get(tid) != due or tid in self._running:
+                heapq.heappop(self._heap)  # superseded, or already running (it reschedules itself)
+                continue
+            if due > now:
+                return due - now
+            heapq.heappop(self._heap)
+            del self._due[tid]
+            task = asyncio.ensure_future(self._crawl_and_reschedule(tid))
+            self._running[tid] = task
+
+            def _done(t: asyncio.Task, tid: str = tid) -> None:
+                if not t.cancelled() and t.exception() is not None:
+                    print(f"Warning: crawl of {tid} failed: {t.exception()}")
+                if self._wake is not None:
+                    self._wake.set()
+
+            task.add_done_callback(_done)
+        return None
+
+    async def _run(self) -> None:
+        while True:
+            delay = self._dispatch()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def _seed(self) -> None:
+        """Add CRAWLER_WATCHLIST boards and load the persisted schedule."""
+        for item in settings.CRAWLER_WATCHLIST.split(','):
+            source, _, board = item.strip().partition(':')
+            if source and board and self._get(target_id(source, board)) is None:
+                try:
+                    self.watch(source, board)
+                except ValueError as e:
+                    print(f"Warning: skipping watchlist entry '{item.strip()}': {e}")
+        for target in self.watchlist():
+            if target.enabled:
+                self._schedule(target.id, target.next_due_at)
+
+    def start(self) -> None:
+        """Start the scheduler (app startup)."""
+        if not settings.CRAWLER_ENABLED or self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._seed()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = list(self._running.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._wake = None
+        self._heap, self._due = [], {}
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'enabled': settings.CRAWLER_ENABLED,
+            'running': self._task is not None and not self._task.done(),
+            'scheduled': len(self._due),
+            'overdue': sum(1 for due in self._due.values() if due <= now),
+            'in_flight': sorted(self._running),
+            'crawled': self.crawled,
+            'changed': self.changed,
+            'failed': self.failed,
+            'next_due_in_seconds': round(min(self._due.values()) - now, 1) if self._due else None,
+        }
+
+
+crawler = Crawler()
@@ -0,0 +1,143 @@
+"""Content-addressed cache of extracted CV text.
+
+Uploads are keyed by the SHA-256 of their bytes plus the file type and the
+extraction limits (CV_MAX_PAGES, CV_MAX_CHARS), so a CV that was parsed
+under the same limits before is served from ``cv_cache.sqlite`` under
+``DATA_DIR`` without touching the parser. When the cache grows past
+``CV_CACHE_MAX_BYTES`` the least recently used entries are evicted.
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.core.settings import settings
+
+# Only the exact names the old upload handler wrote: cv_<uuid4>_<filename>.
+_LEGACY_UPLOAD = re.compile(r'cv_[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}_.+')
+
+
+def purge_uploads() -> int:
+    """Delete upload files left on disk by older versions (app startup).
+
+    CVs used to be written to ``DATA_DIR/cv_<uuid>_<filename>`` and later
+    spooled under ``DATA_DIR/uploads``; they are now parsed in memory.
+    Anything else in ``DATA_DIR`` is left alone. Returns how many files
+    were removed.
+    """
+    stale = [p for p in settings.DATA_DIR.glob('cv_*_*') if p.is_file() and _LEGACY_UPLOAD.fullmatch(p.name)]
+    spool = settings.DATA_DIR / 'uploads'
+    if spool.is_dir():
+        stale += [p for p in spool.iterdir() if p.is_file()]
+    removed = 0
+    for p in stale:
+        try:
+            p.unlink()
+            removed += 1
+        except OSError:
+            pass
+    if spool.is_dir() and not any(spool.iterdir()):
+        spool.rmdir()
+    return removed
+
+
+class CVTextCache:
+    """SQLite-backed store of extracted CV text with size-based LRU eviction."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self._path or settings.DATA_DIR / 'cv_cache.sqlite'
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cv_text ('
+                ' key TEXT PRIMARY KEY,'
+                ' filetype TEXT NOT NULL,'
+                ' text TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cv_text_accessed ON cv_text (accessed_at)')
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def key(digest: str, filetype: str) -> str:
+        # Text extracted under other limits was truncated differently.
+        return f"{digest}:{filetype}:p{settings.CV_MAX_PAGES}:c{settings.CV_MAX_CHARS}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            db = self._db()
+            row = db.execute('SELECT text FROM cv_text WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute('UPDATE cv_text SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, filetype: str, text: str) -> None:
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            db = self._db()
+            db.execute(
+                'INSERT OR REPLACE INTO cv_text (key, filetype, text, size, created_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (key, filetype, text, size, now, now),
+            )
+            self.writes += 1
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM cv_text').fetchone()[0]
+        if total <= settings.CV_CACHE_MAX_BYTES:
+            return
+        for key, size in db.execute('SELECT key, size FROM cv_text ORDER BY accessed_at ASC').fetchall():
+            if total <= settings.CV_CACHE_MAX_BYTES:
+                break
+            db.execute('DELETE FROM cv_text WHERE key = ?', (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute('DELETE FROM cv_text')
+            db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cv_text').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'enabled': settings.CV_CACHE_ENABLED,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': settings.CV_CACHE_MAX_BYTES,
+        }
+
+
+cv_cache = CVTextCache()
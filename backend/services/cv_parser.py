@@ -1,17 +1,209 @@
+"""CV text extraction.
+
+``parse_cv`` is the plain synchronous extractor. The API goes through
+``cv_pool``, which runs PDF/DOCX extraction in a bounded process pool so
+a large or malformed document cannot stall the event loop (PyMuPDF and
+python-docx hold the GIL while they work). Plain-text files are read on a
+thread. Each parse has a timeout; a worker stuck past it is killed and the
+pool restarted. Documents are passed as bytes; nothing is written to disk.
+"""
 from __future__ import annotations
+
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-import fitz  # PyMuPDF
-from docx import Document
-
-def parse_cv(path: Path) -> str:
-    suffix = path.suffix.lower()
-    if suffix == '.pdf':
-        doc = fitz.open(str(path))
-        text = []
-        for page in doc:
-            text.append(page.get_text())
-        return '\n'.join(text).strip()
-    if suffix in ('.docx',):
-        d = Document(str(path))
-        return '\n'.join(p.text for p in d.paragraphs).strip()
-    return path.read_text(encoding='utf-8', errors='ignore').strip()
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from backend.core.metrics import (
+    CV_PARSE_FAILURES,
+    CV_PARSE_IN_FLIGHT,
+    CV_PARSE_QUEUED,
+    CV_PARSE_SECONDS,
+    CV_POOL_RESTARTS,
+)
+from backend.core.settings import settings
+
+FILETYPES = {'.pdf': 'pdf', '.docx': 'docx'}
+
+
+class CVParseError(ValueError):
+    """The CV was rejected (too large, too many pages, timed out, pool busy)."""
+
+    def __init__(self, message: str, status: int = 422):
+        super().__init__(message)
+        self.status = status
+
+    def __reduce__(self):
+        # Raised in pool workers; keep the status when pickled back.
+        return type(self), (str(self), self.status)
+
+
+def parse_cv(
+    source: Union[Path, bytes, BinaryIO],
+    filetype: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """Extract text from a CV given as a path, bytes or a binary file object.
+
+    ``filetype`` ('pdf', 'docx' or 'text') defaults to the path's suffix.
+    Extraction goes page by page (paragraph by paragraph for DOCX) and
+    stops once ``max_chars`` characters have been collected.
+    """
+    if isinstance(source, Path):
+        filetype = filetype or FILETYPES.get(source.suffix.lower(), 'text')
+        source = source.read_bytes()
+    elif not isinstance(source, (bytes, bytearray)):
+        source = source.read()
+    filetype = filetype or 'text'
+    limit = max_chars or None
+
+    parts: list[str] = []
+    total = 0
+    # PyMuPDF and python-docx are imported on first use; they are slow to load.
+    if filetype == 'pdf':
+        import fitz  # PyMuPDF
+
+        with fitz.open(stream=source, filetype='pdf') as doc:
+            if max_pages and doc.page_count > max_pages:
+                raise CVParseError(f"CV has {doc.page_count} pages (limit {max_pages})", 413)
+            for page in doc:
+                parts.append(page.get_text())
+                total += len(parts[-1]) + 1
+                if limit and total >= limit:
+                    break
+    elif filetype == 'docx':
+        from docx import Document
+
+        for p in Document(io.BytesIO(source)).paragraphs:
+            parts.append(p.text)
+            total += len(p.text) + 1
+            if limit and total >= limit:
+                break
+    else:
+        parts.append(bytes(source[: limit * 4] if limit else source).decode('utf-8', errors='ignore'))
+    text = '\n'.join(parts)
+    return (text[:limit] if limit else text).strip()
+
+
+def _workers() -> int:
+    return settings.CV_PARSE_WORKERS or min(4, os.cpu_count() or 1)
+
+
+class CVParsePool:
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.running = 0
+        self.parsed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe.
+            self._pool = ProcessPoolExecutor(
+                max_workers=_workers(),
+                mp_context=multiprocessing.get_context('spawn'),
+                max_tasks_per_child=settings.CV_PARSE_MAX_TASKS_PER_CHILD or None,
+            )
+        return self._pool
+
+    def _restart(self) -> None:
+        """Kill every worker (one is stuck) and start a fresh pool on next use."""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        self.restarts += 1
+        CV_POOL_RESTARTS.inc()
+        # No public way to stop a running task before Python 3.14.
+        for proc in list(getattr(pool, '_processes', {}).values()):
+            proc.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fail(self, filetype: str, reason: str, message: str, status: int) -> CVParseError:
+        self.failed += 1
+        CV_PARSE_FAILURES.inc(filetype, reason)
+        return CVParseError(message, status)
+
+    async def _extract(self, data: bytes, filetype: str) -> str:
+        loop = asyncio.get_running_loop()
+        args = (data, filetype, settings.CV_MAX_PAGES, settings.CV_MAX_CHARS)
+        if filetype == 'text':
+            return await asyncio.to_thread(parse_cv, *args)
+        for attempt in range(2):
+            pool = self._executor()
+            try:
+                return await loop.run_in_executor(pool, parse_cv, *args)
+            except BrokenProcessPool:
+                # Another parse timed out and took the pool down with it; retry once.
+                if self._pool is pool:
+                    self._pool = None
+                if attempt:
+                    raise
+
+    async def parse(self, data: bytes, filetype: str) -> str:
+        """Extract the text of an in-memory CV off the event loop, enforcing
+        size, page, character and time limits."""
+        if len(data) > settings.CV_MAX_BYTES:
+            raise self._fail(filetype, 'too_large', f"CV is {len(data)} bytes (limit {settings.CV_MAX_BYTES})", 413)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(_workers())
+        if self.queued >= settings.CV_PARSE_MAX_QUEUE:
+            raise self._fail(filetype, 'busy', 'Too many CVs waiting to be parsed, try again shortly', 503)
+
+        self.queued += 1
+        with CV_PARSE_QUEUED.track():
+            try:
+                await self._slots.acquire()
+            finally:
+                self.queued -= 1
+        self.running += 1
+        try:
+            with CV_PARSE_IN_FLIGHT.track(), CV_PARSE_SECONDS.time(filetype):
+                text = await asyncio.wait_for(self._extract(data, filetype), settings.CV_PARSE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._restart()
+            raise self._fail(filetype, 'timeout', f"CV parsing took longer than {settings.CV_PARSE_TIMEOUT_SECONDS}s", 422) from None
+        except CVParseError as e:
+            raise self._fail(filetype, 'too_large', str(e), e.status) from None
+        except Exception:
+            self.failed += 1
+            CV_PARSE_FAILURES.inc(filetype, 'error')
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+        self.parsed += 1
+        return text
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': _workers(),
+            'started': self._pool is not None,
+            'queued': self.queued,
+            'running': self.running,
+            'parsed': self.parsed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'restarts': self.restarts,
+            'timeout_seconds': settings.CV_PARSE_TIMEOUT_SECONDS,
+            'max_bytes': settings.CV_MAX_BYTES,
+            'max_pages': settings.CV_MAX_PAGES,
+            'max_chars': settings.CV_MAX_CHARS,
+        }
+
+
+cv_pool = CVParsePool()
@@ -1,5 +1,15 @@
 from __future__ import annotations
 from backend.app.schemas.job import JobPosting
+from backend.services.locations import resolve_location
+
+_INTERVALS = {'1 YEAR': 'year', '1 MONTH': 'month', '1 WEEK': 'week', '1 DAY': 'day', '1 HOUR': 'hour'}
+
+def _placed(loc: str | None, fallback: str | None = None, remote: bool = False) -> dict:
+    """country/countries/remote fields for a location; ``fallback`` is a
+    structured country the ATS gives separately."""
+    where = resolve_location(loc)
+    countries = where.countries or resolve_location(fallback).countries
+    return {'country': countries[0] if countries else None, 'countries': list(countries), 'remote': remote or where.remote}
 
 def to_jobposting_from_greenhouse(j: dict) -> JobPosting:
     loc = (j.get('location') or {}).get('name')
@@ -12,8 +22,7 @@ def to_jobposting_from_greenhouse(j: dict) -> JobPosting:
         description=None,
         source='greenhouse',
         posted_at=j.get('updated_at') or j.get('created_at'),
-        country=None,
-        remote=None,
+        **_placed(loc),
     )
 
 def to_jobposting_from_lever(j: dict, company: str) -> JobPosting:
@@ -27,6 +36,44 @@ def to_jobposting_from_lever(j: dict, company: str) -> JobPosting:
         description=j.get('descriptionPlain') or None,
         source='lever',
         posted_at=j.get('createdAt') and str(j.get('createdAt')),
-        country=None,
-        remote=None,
+        **_placed(loc, j.get('country'), j.get('workplaceType') == 'remote'),
+    )
+
+def _amount(v: float) -> str:
+    return f"{v / 1000:g}K" if v >= 1000 else f"{v:g}"
+
+def _ashby_compensation(comp: dict) -> str | None:
+    """Salary summary: Ashby's own, else built from the salary components."""
+    summary = comp.get('scrapeableCompensationSalarySummary') or comp.get('compensationTierSummary')
+    if summary:
+        return summary
+    parts = []
+    for c in comp.get('summaryComponents') or []:
+        if c.get('compensationType') != 'Salary':
+            continue
+        lo, hi = c.get('minValue'), c.get('maxValue')
+        if lo is None and hi is None:
+            continue
+        span = ' – '.join(_amount(v) for v in dict.fromkeys(v for v in (lo, hi) if v is not None))
+        interval = _INTERVALS.get(c.get('interval') or '', '')
+        parts.append(f"{c.get('currencyCode') or ''} {span}{' / ' + interval if interval else ''}".strip())
+    return '; '.join(parts) or None
+
+def to_jobposting_from_ashby(j: dict, org: str) -> JobPosting:
+    # Primary location first, then secondary ones, without repeats.
+    names = [j.get('location')] + [s.get('location') for s in j.get('secondaryLocations') or []]
+    loc = '; '.join(dict.fromkeys(n for n in names if n)) or None
+    postal = (j.get('address') or {}).get('postalAddress') or {}
+    remote = bool(j.get('isRemote') or j.get('workplaceType') == 'Remote')
+    return JobPosting(
+        id=j.get('id') or j.get('jobUrl') or 'ashby',
+        title=j.get('title', ''),
+        company=org,
+        location=loc,
+        url=j.get('jobUrl') or j.get('applyUrl') or '',
+        description=j.get('descriptionPlain') or None,
+        source='ashby',
+        posted_at=j.get('publishedAt'),
+        **_placed(loc, postal.get('addressCountry'), remote),
+        compensation=_ashby_compensation(j.get('compensation') or {}),
     )
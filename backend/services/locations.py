@@ -0,0 +1,260 @@
+"""Resolve free-text posting locations to ISO country codes.
+
+ATS boards give locations as free text ("Berlin, DE", "Austin, TX",
+"Remote - EMEA", "London; Toronto, ON"). ``resolve_location`` splits one
+into places (``;``, ``/``, ``|``, ``or``) and each place into parts
+(commas, `` - ``, brackets, a hyphen next to a code), looks up every part's words in a token index
+compiled once from the gazetteer below, and memoizes the result per raw
+string, since boards repeat the same few locations across postings.
+
+Within a place the broadest match wins (a country name or code over a
+region over a city), so "London, Ontario" is Canada. Codes only
+count as the first or last word of a part ("Remote US", "US-Remote"),
+never inside words ("CITY" is not Italy). A code that is also a state or
+province ("CA", "DE", "WA") is read in light of the rest of the place: the
+city decides when known ("Berlin, DE" is Germany, "Perth, WA" Australia,
+"Dublin, CA" California), an unknown place name before it means a state
+("Wilmington, DE"), and otherwise it is the country ("Remote - DE").
+Likewise a country name that is also a state ("Georgia") is the country
+only next to one of its cities ("Tbilisi, Georgia").
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ISO2 ISO3 | names and aliases | cities
+_COUNTRIES = """
+US USA | united states, united states of america, usa, u s a | new york city, san francisco, los angeles, seattle, boston, chicago, austin, denver, atlanta, miami, san diego, san jose, palo alto, mountain view, menlo park, sunnyvale, redwood city, oakland, portland, philadelphia, pittsburgh, washington dc, houston, dallas, phoenix, salt lake city, minneapolis, detroit, raleigh, nashville, brooklyn, cambridge ma, boulder
+CA CAN | canada | toronto, montreal, vancouver, ottawa, calgary, edmonton, waterloo, quebec city, halifax, winnipeg
+MX MEX | mexico | mexico city, guadalajara, monterrey
+BR BRA | brazil, brasil | sao paulo, rio de janeiro, belo horizonte, florianopolis, curitiba
+AR ARG | argentina | buenos aires, cordoba
+CL CHL | chile | santiago
+CO COL | colombia | bogota, medellin
+PE PER | peru | lima
+UY URY | uruguay | montevideo
+GB GBR | united kingdom, uk, great britain, britain, england, scotland, wales, northern ireland | london, manchester, edinburgh, glasgow, bristol, cambridge, oxford, birmingham, leeds, belfast, cardiff, reading, brighton, newcastle
+IE IRL | ireland | dublin, cork, galway, limerick
+DE DEU | germany, deutschland | berlin, munich, munchen, hamburg, frankfurt, cologne, koln, stuttgart, dusseldorf, leipzig, dresden, nuremberg, nurnberg, hanover, bonn, karlsruhe, heidelberg
+FR FRA | france | paris, lyon, marseille, toulouse, bordeaux, lille, nantes, nice, montpellier, grenoble, sophia antipolis
+IT ITA | italy, italia | rome, roma, milan, milano, turin, torino, florence, firenze, naples, napoli, bologna, venice, genoa, genova, padua, padova, verona, trieste, pisa, bari, palermo, catania
+ES ESP | spain, espana | madrid, barcelona, valencia, seville, sevilla, malaga, bilbao, zaragoza
+PT PRT | portugal | lisbon, lisboa, porto, braga, coimbra
+NL NLD | netherlands, the netherlands, holland | amsterdam, rotterdam, the hague, utrecht, eindhoven, delft, leiden, groningen
+BE BEL | belgium | brussels, antwerp, ghent, leuven
+LU LUX | luxembourg |
+CH CHE | switzerland, schweiz, suisse, svizzera | zurich, geneva, geneve, basel, bern, lausanne, lugano, zug
+AT AUT | austria, osterreich | vienna, wien, graz, linz, salzburg, innsbruck
+DK DNK | denmark | copenhagen, aarhus
+SE SWE | sweden | stockholm, gothenburg, goteborg, malmo, uppsala
+NO NOR | norway | oslo, bergen, trondheim
+FI FIN | finland | helsinki, espoo, tampere
+IS ISL | iceland | reykjavik
+EE EST | estonia | tallinn, tartu
+LV LVA | latvia | riga
+LT LTU | lithuania | vilnius, kaunas
+PL POL | poland, polska | warsaw, krakow, wroclaw, gdansk, poznan, lodz
+CZ CZE | czech republic, czechia | prague, brno
+SK SVK | slovakia | bratislava
+HU HUN | hungary | budapest
+RO ROU | romania | bucharest, cluj napoca, iasi, timisoara
+BG BGR | bulgaria | sofia, plovdiv
+GR GRC | greece | athens, thessaloniki
+HR HRV | croatia | zagreb, split
+SI SVN | slovenia | ljubljana
+RS SRB | serbia | belgrade, novi sad
+UA UKR | ukraine | kyiv, kiev, lviv, kharkiv, odesa
+TR TUR | turkey, turkiye | istanbul, ankara, izmir
+GE GEO | georgia, sakartvelo | tbilisi, batumi, kutaisi
+CY CYP | cyprus | limassol, nicosia
+MT MLT | malta | valletta
+IL ISR | israel | tel aviv, jerusalem, haifa, herzliya
+AE ARE | united arab emirates, uae | dubai, abu dhabi
+SA SAU | saudi arabia | riyadh, jeddah
+EG EGY | egypt | cairo
+ZA ZAF | south africa | cape town, johannesburg, durban
+NG NGA | nigeria | lagos, abuja
+KE KEN | kenya | nairobi
+IN IND | india | bangalore, bengaluru, hyderabad, mumbai, pune, chennai, delhi, new delhi, gurgaon, gurugram, noida, kolkata
+PK PAK | pakistan | karachi, lahore, islamabad
+SG SGP | singapore |
+MY MYS | malaysia | kuala lumpur
+ID IDN | indonesia | jakarta
+TH THA | thailand | bangkok
+VN VNM | vietnam, viet nam | ho chi minh city, hanoi
+PH PHL | philippines | manila
+CN CHN | china | beijing, shanghai, shenzhen, hangzhou, guangzhou
+HK HKG | hong kong |
+TW TWN | taiwan | taipei
+JP JPN | japan | tokyo, osaka, kyoto
+KR KOR | south korea, korea | seoul
+AU AUS | australia | sydney, melbourne, brisbane, perth, adelaide, canberra
+NZ NZL | new zealand | auckland, wellington, christchurch
+"""
+
+# ISO2 | region name = code, ... (codes count as regions only after a place name)
+_REGIONS = """
+US | alabama=AL, alaska=AK, arizona=AZ, arkansas=AR, california=CA, colorado=CO, connecticut=CT, delaware=DE, district of columbia=DC, florida=FL, georgia=GA, hawaii=HI, idaho=ID, illinois=IL, indiana=IN, iowa=IA, kansas=KS, kentucky=KY, louisiana=LA, maine=ME, maryland=MD, massachusetts=MA, michigan=MI, minnesota=MN, mississippi=MS, missouri=MO, montana=MT, nebraska=NE, nevada=NV, new hampshire=NH, new jersey=NJ, new mexico=NM, new york=NY, north carolina=NC, north dakota=ND, ohio=OH, oklahoma=OK, oregon=OR, pennsylvania=PA, rhode island=RI, south carolina=SC, south dakota=SD, tennessee=TN, texas=TX, utah=UT, vermont=VT, virginia=VA, washington=WA, west virginia=WV, wisconsin=WI, wyoming=WY
+CA | alberta=AB, british columbia=BC, manitoba=MB, new brunswick=NB, newfoundland=NL, nova scotia=NS, ontario=ON, prince edward island=PE, quebec=QC, saskatchewan=SK
+AU | new south wales=NSW, victoria=VIC, queensland=QLD, western australia=WA, south australia=SA, tasmania=TAS
+DE | bavaria=, bayern=, baden wurttemberg=, north rhine westphalia=, nordrhein westfalen=, hesse=, hessen=, saxony=, lower saxony=, brandenburg=
+IT | lombardy=, lombardia=, lazio=, piedmont=, piemonte=, tuscany=, toscana=, emilia romagna=, veneto=, campania=, sicily=, sicilia=, sardinia=, sardegna=, apulia=, puglia=, liguria=
+ES | catalonia=, cataluna=, andalusia=, basque country=
+CH | ticino=, vaud=
+"""
+
+_REMOTE = {'remote', 'anywhere', 'worldwide', 'wfh', 'distributed', 'telecommute'}
+_REMOTE_PHRASES = ('work from home', 'home based', 'home office', 'fully remote')
+_NOT_REMOTE = ('non remote', 'not remote', 'no remote', 'onsite only', 'on site only')
+
+_PLACES = re.compile(r'\s*(?:;|/|\||\bor\b|&|\n)\s*')
+# A bare hyphen only separates next to a code ("US-Remote", "Remote-DE"),
+# so "Baden-Württemberg" stays one name.
+_PARTS = re.compile(r'\s*(?:,|\(|\)|\s[-–—]\s|:|(?<=\b[A-Z]{2})-|(?<=\b[A-Z]{3})-|-(?=[A-Z]{2,3}\b))\s*')
+_WORD = re.compile(r"[A-Za-z0-9]+")
+
+_CITY, _REGION, _COUNTRY = 1, 2, 3
+
+
+class Location(NamedTuple):
+    countries: Tuple[str, ...]  # ISO 3166-1 alpha-2, primary place first
+    remote: bool
+
+    @property
+    def country(self) -> Optional[str]:
+        return self.countries[0] if self.countries else None
+
+
+def _fold(text: str) -> str:
+    """Lowercase ASCII words: 'Zürich' -> 'zurich', 'Baden-Württemberg' -> 'baden wurttemberg'."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def _compile() -> Tuple[Dict[str, Tuple[int, str]], Dict[str, str], Dict[str, Tuple[str, ...]], Dict[str, str], int]:
+    names: Dict[str, Tuple[int, str]] = {}  # folded phrase -> (level, ISO2)
+    codes: Dict[str, str] = {'UK': 'GB'}  # 'DE' / 'DEU' -> ISO2
+    region_codes: Dict[str, Tuple[str, ...]] = {}  # 'WA' -> ('US', 'AU'), gazetteer order
+    shared: Dict[str, str] = {}  # country name that is also a region -> the region's ISO2 ('georgia' -> 'US')
+    for line in _COUNTRIES.strip().splitlines():
+        head, aliases, cities = (p.strip() for p in line.split('|'))
+        iso2, iso3 = head.split()
+        codes[iso2] = codes[iso3] = iso2
+        for city in filter(None, (c.strip() for c in cities.split(','))):
+            names.setdefault(_fold(city), (_CITY, iso2))
+        for alias in filter(None, (a.strip() for a in aliases.split(','))):
+            names[_fold(alias)] = (_COUNTRY, iso2)
+    for line in _REGIONS.strip().splitlines():
+        iso2, regions = (p.strip() for p in line.split('|'))
+        for entry in regions.split(','):
+            name, _, code = entry.strip().partition('=')
+            hit = names.setdefault(_fold(name), (_REGION, iso2))
+            if hit[0] == _COUNTRY:
+                shared[_fold(name)] = iso2
+            if code:
+                region_codes[code] = region_codes.get(code, ()) + (iso2,)
+    longest = max(len(n.split()) for n in names)
+    return names, codes, region_codes, shared, longest
+
+
+_NAMES, _CODES, _REGION_CODES, _SHARED, _LONGEST = _compile()
+
+
+def _match_words(words: List[str], city: Optional[str] = None) -> List[Tuple[int, str]]:
+    """Greedy longest-phrase matches of folded ``words`` against the name index."""
+    hits, i = [], 0
+    while i < len(words):
+        for n in range(min(_LONGEST, len(words) - i), 0, -1):
+            phrase = ' '.join(words[i:i + n])
+            hit = _NAMES.get(phrase)
+            if hit is not None:
+                if phrase in _SHARED and city != hit[1]:
+                    # Only a city of the country makes "Georgia" the country
+                    # ("Tbilisi, Georgia"); otherwise it is the state.
+                    hit = (_REGION, _SHARED[phrase])
+                hits.append(hit)
+                i += n
+                break
+        else:
+            i += 1
+    return hits
+
+
+def _code(token: str, city: Optional[str], named_before: bool, alone: bool) -> Optional[Tuple[int, str]]:
+    """Read an upper-case code such as 'DE', 'CA' or 'WA' in its place's context."""
+    as_country, as_regions = _CODES.get(token), _REGION_CODES.get(token, ())
+    if as_country is None and not as_regions:
+        return None
+    if city is not None:
+        # The city decides: "Berlin, DE", "Perth, WA"; one it contradicts
+        # ("Dublin, CA", "Valencia, CA") takes the state reading.
+        if city == as_country:
+            return (_COUNTRY, city)
+        if city in as_regions:
+            return (_REGION, city)
+        return (_REGION, as_regions[0]) if as_regions else (_COUNTRY, as_country)
+    if as_regions and (as_country is None or (named_before and alone)):
+        return (_REGION, as_regions[0])  # "Wilmington, DE", "Austin, TX"
+    return (_COUNTRY, as_country)
+
+
+def _resolve_place(place: str) -> Optional[str]:
+    parts = [
+        _WORD.findall(unicodedata.normalize('NFKD', part).encode('ascii', 'ignore').decode('ascii'))
+        for part in filter(None, _PARTS.split(place))
+    ]
+    # The place's first known city, wherever it stands, settles names and codes
+    # with more than one reading.
+    city = next(
+        (iso for raw in parts for level, iso in _match_words([w.lower() for w in raw]) if level == _CITY), None
+    )
+    best: Optional[Tuple[int, str]] = None
+    named_before = False  # an unresolved place name precedes, as in "Wilmington, DE"
+    for raw in parts:
+        words = [w.lower() for w in raw]
+        hits = _match_words(words, city)
+        if not hits and raw:
+            # Codes count as the last or first word only: "Remote US", "US Remote".
+            for token in dict.fromkeys((raw[-1], raw[0])):
+                hit = _code(token, city, named_before, len(raw) == 1) if token.isupper() else None
+                if hit is not None:
+                    hits = [hit]
+                    break
+        if not hits and words and not _REMOTE.intersection(words):
+            named_before = True
+        for level, iso in hits:
+            if best is None or level >= best[0]:
+                best = (level, iso)
+    return best[1] if best else None
+
+
+@lru_cache(maxsize=4096)
+def resolve_location(location: Optional[str]) -> Location:
+    """Countries and remote flag of a free-text location (memoized)."""
+    if not location:
+        return Location((), False)
+    folded = _fold(location)
+    remote = (bool(_REMOTE.intersection(folded.split())) or any(p in folded for p in _REMOTE_PHRASES)) and not any(
+        p in folded for p in _NOT_REMOTE
+    )
+    countries: List[str] = []
+    for place in filter(None, _PLACES.split(location)):
+        iso = _resolve_place(place)
+        if iso and iso not in countries:
+            countries.append(iso)
+    return Location(tuple(countries), remote)
+
+
+def country_codes(values: List[str]) -> List[str]:
+    """Map user-given countries ('DE', 'UK', 'Germany') to ISO codes."""
+    out: List[str] = []
+    for v in values:
+        # A country filter means the country, even where a state shares its name.
+        hit = _NAMES.get(_fold(v))
+        for iso in (hit[1],) if hit and hit[0] == _COUNTRY else resolve_location(v).countries or (v.upper(),):
+            if iso not in out:
+                out.append(iso)
+    return out
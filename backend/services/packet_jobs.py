@@ -0,0 +1,246 @@
+"""Background queue for application-packet generation.
+
+Submitting a packet stores a ``PacketJobRecord`` and returns its id at
+once; a small pool of workers generates packets in the background. Job
+state lives in SQLite, so queued jobs, and jobs that were running when
+the process stopped, are picked up again on the next start (up to
+PACKET_JOB_MAX_ATTEMPTS times). Clients poll the record or subscribe to
+its events (``status``, ``token``, ``done``, ``error``).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from sqlmodel import select
+
+from backend.app.models.db import PacketJobRecord
+from backend.core.db import session
+from backend.core.settings import settings
+from backend.crews.jobcraft_crew import fit_packet_inputs, stream_application_packet
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+Event = tuple[str, dict]
+
+
+def job_view(job: PacketJobRecord) -> Dict[str, Any]:
+    """Public fields of a job (the stored CV text is left out)."""
+    data = job.model_dump(mode='json', exclude={'profile_text', 'dropped'})
+    data['dropped'] = json.loads(job.dropped) if job.dropped else []
+    return data
+
+
+class PacketJobQueue:
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._workers: list[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()
+        self._subscribers: Dict[str, Set[asyncio.Queue[Event]]] = {}
+
+    # -- persistence -------------------------------------------------------
+
+    def _update(self, job_id: str, **fields: Any) -> Optional[PacketJobRecord]:
+        with session() as s:
+            job = s.get(PacketJobRecord, job_id)
+            if job is None:
+                return None
+            for k, v in fields.items():
+                setattr(job, k, v)
+            s.add(job)
+            s.commit()
+            s.refresh(job)
+            return job
+
+    def get(self, job_id: str) -> Optional[PacketJobRecord]:
+        with session() as s:
+            return s.get(PacketJobRecord, job_id)
+
+    def submit(
+        self,
+        provider: str,
+        profile_text: str,
+        job_title: str,
+        company: str,
+        job_desc: str,
+        country: str | None = None,
+        ref: str | None = None,
+        no_cache: bool = False,
+        refresh: bool = False,
+    ) -> PacketJobRecord:
+        if self._queue is None:
+            raise RuntimeError('Packet job workers are not running')
+        job = PacketJobRecord(
+            id=uuid.uuid4().hex,
+            provider=provider,
+            profile_text=profile_text,
+            job_title=job_title,
+            company=company,
+            job_description=job_desc,
+            country=country,
+            ref=ref,
+            no_cache=no_cache,
+            refresh=refresh,
+        )
+        with session() as s:
+            s.add(job)
+            s.commit()
+            s.refresh(job)
+        self._queue.put_nowait(job.id)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[PacketJobRecord]:
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+        job = self._update(job_id, status='cancelled', finished_at=datetime.utcnow())
+        self._publish(job_id, 'error', {'status': 'cancelled', 'detail': 'Cancelled'})
+        return job
+
+    def _recover(self) -> list[str]:
+        """Requeue unfinished jobs and prune old finished ones (startup)."""
+        cutoff = datetime.utcnow() - timedelta(days=settings.PACKET_JOB_RETENTION_DAYS)
+        with session() as s:
+            for job in s.exec(select(PacketJobRecord).where(PacketJobRecord.finished_at < cutoff)).all():
+                s.delete(job)
+            pending = s.exec(
+                select(PacketJobRecord)
+                .where(PacketJobRecord.status.in_(('queued', 'running')))
+                .order_by(PacketJobRecord.created_at)
+            ).all()
+            ids = []
+            for job in pending:
+                # 'running' here means the previous process died mid-generation.
+                if job.attempts >= settings.PACKET_JOB_MAX_ATTEMPTS:
+                    job.status = 'failed'
+                    job.error = f"Gave up after {job.attempts} interrupted attempts"
+                    job.finished_at = datetime.utcnow()
+                else:
+                    job.status = 'queued'
+                    ids.append(job.id)
+                s.add(job)
+            s.commit()
+        return ids
+
+    # -- events --------------------------------------------------------------
+
+    def _publish(self, job_id: str, event: str, data: dict) -> None:
+        for q in self._subscribers.get(job_id, ()):
+            q.put_nowait((event, data))
+
+    async def events(self, job_id: str) -> AsyncIterator[Event]:
+        """Current status, then live events until the job finishes."""
+        q: asyncio.Queue[Event] = asyncio.Queue()
+        # Subscribe before reading the row so no transition is missed.
+        self._subscribers.setdefault(job_id, set()).add(q)
+        try:
+            job = self.get(job_id)
+            if job is None:
+                return
+            yield 'status', {'status': job.status}
+            if job.status in FINISHED:
+                yield self._final_event(job)
+                return
+            while True:
+                event, data = await q.get()
+                yield event, data
+                if event in ('done', 'error'):
+                    return
+        finally:
+            subs = self._subscribers.get(job_id)
+            if subs is not None:
+                subs.discard(q)
+                if not subs:
+                    del self._subscribers[job_id]
+
+    @staticmethod
+    def _final_event(job: PacketJobRecord) -> Event:
+        if job.status == 'done':
+            return 'done', job_view(job)
+        return 'error', {'status': job.status, 'detail': job.error or job.status}
+
+    # -- workers -------------------------------------------------------------
+
+    async def _generate(self, job: PacketJobRecord) -> None:
+        inputs = fit_packet_inputs(job.provider, job.profile_text, job.job_title, job.company, job.job_description, job.country)
+        parts: list[str] = []
+        async for chunk in stream_application_packet(
+            job.provider, job.profile_text, job.job_title, job.company, job.job_description,
+            country=job.country, no_cache=job.no_cache, refresh=job.refresh, inputs=inputs,
+        ):
+            parts.append(chunk)
+            self._publish(job.id, 'token', {'text': chunk})
+        job = self._update(
+            job.id,
+            status='done',
+            markdown=''.join(parts),
+            dropped=json.dumps(inputs.dropped),
+            finished_at=datetime.utcnow(),
+        )
+        self._publish(job.id, 'done', job_view(job))
+
+    async def _run_one(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is None or job.status != 'queued':
+            return  # cancelled or already handled
+        job = self._update(job_id, status='running', started_at=datetime.utcnow(), attempts=job.attempts + 1)
+        self._publish(job_id, 'status', {'status': 'running'})
+        task = asyncio.ensure_future(self._generate(job))
+        self._running[job_id] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            if job_id not in self._cancelled:
+                raise  # the worker itself is shutting down; the job stays 'running' and is requeued
+        except Exception as e:
+            self._update(job_id, status='failed', error=str(e) or type(e).__name__, finished_at=datetime.utcnow())
+            self._publish(job_id, 'error', {'status': 'failed', 'detail': str(e) or type(e).__name__})
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_one(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Warning: packet job {job_id} crashed: {e}")
+
+    def start(self) -> None:
+        """Requeue persisted jobs and start the workers (app startup)."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        for job_id in self._recover():
+            self._queue.put_nowait(job_id)
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._worker()) for _ in range(max(1, settings.PACKET_JOB_WORKERS))]
+
+    async def stop(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': len(self._workers),
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'running': len(self._running),
+            'subscribers': sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+packet_jobs = PacketJobQueue()
@@ -0,0 +1,231 @@
+"""Incremental sync of discovered postings into the local postings table.
+
+``sync_board`` compares a board's freshly normalized postings with the
+stored ones by a hash of the listing as the ATS gave it (not of fields
+derived from it, such as the resolved country) and writes only the
+difference: new and changed postings are upserted, unchanged ones just
+get ``last_seen_at`` bumped, and a posting missing from
+POSTINGS_REMOVE_AFTER_MISSES consecutive non-empty listings is marked
+removed (an empty listing is more likely a bad response than a board
+that closed every posting). Every
+difference is appended to the ``PostingChange`` feed, which digests and
+alerts read incrementally by sequence number.
+
+``enrich_board`` then fetches descriptions (Greenhouse lists omit them)
+and scores only postings whose content hash moved since they were last
+enriched.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import html
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlmodel import delete, select, update
+
+from backend.app.models.db import PostingChange, PostingRecord, ProfileRecord
+from backend.app.schemas.job import JobPosting
+from backend.core.db import session
+from backend.core.settings import settings
+from backend.services.matching import score_job
+
+_TAGS = re.compile(r'<[^>]+>')
+_board_locks: Dict[str, asyncio.Lock] = {}
+_HASHED_FIELDS = ('title', 'company', 'location', 'url', 'posted_at', 'description', 'compensation')
+_DERIVED_FIELDS = ('country', 'remote')  # stored, but re-derivable, so not part of the hash
+
+
+def posting_key(source: str, board: str, posting_id: str) -> str:
+    return f"{source}:{board}:{posting_id}"
+
+
+def content_hash(job: JobPosting) -> str:
+    data = {k: getattr(job, k) for k in _HASHED_FIELDS}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+@dataclass
+class SyncResult:
+    source: str
+    board: str
+    new: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.new or self.changed or self.removed)
+
+    def counts(self) -> Dict[str, int]:
+        return {'new': len(self.new), 'changed': len(self.changed), 'removed': len(self.removed), 'unchanged': self.unchanged}
+
+
+def _change(kind: str, rec: PostingRecord) -> PostingChange:
+    return PostingChange(
+        posting_key=rec.id, source=rec.source, board=rec.board, kind=kind,
+        title=rec.title, company=rec.company, url=rec.url,
+    )
+
+
+def sync_board(source: str, board: str, jobs: List[JobPosting]) -> SyncResult:
+    """Apply one complete listing of a board to the postings table (an
+    empty listing adds and removes nothing)."""
+    result = SyncResult(source, board)
+    now = datetime.utcnow()
+    with session() as s:
+        stored = {
+            r.id: r
+            for r in s.exec(select(PostingRecord).where(PostingRecord.source == source, PostingRecord.board == board)).all()
+        }
+        seen: Set[str] = set()
+        touched: List[str] = []
+        for job in jobs:
+            key = posting_key(source, board, job.id)
+            if key in seen:
+                continue  # some boards list a posting twice
+            seen.add(key)
+            digest = content_hash(job)
+            rec = stored.get(key)
+            if rec is not None and rec.content_hash == digest and rec.status == 'active':
+                result.unchanged += 1
+                if rec.missed or any(getattr(rec, k) != getattr(job, k) for k in _DERIVED_FIELDS):
+                    # Back after a miss, or resolved differently: update quietly.
+                    for k in _DERIVED_FIELDS:
+                        setattr(rec, k, getattr(job, k))
+                    rec.missed = 0
+                    rec.last_seen_at = now
+                    s.add(rec)
+                else:
+                    touched.append(key)
+                continue
+            kind = 'new' if rec is None or rec.status == 'removed' else 'changed'
+            if rec is None:
+                rec = PostingRecord(id=key, source=source, board=board, posting_id=job.id, content_hash=digest,
+                                    title=job.title, company=job.company, url=job.url, first_seen_at=now)
+            for k in _HASHED_FIELDS + _DERIVED_FIELDS:
+                setattr(rec, k, getattr(job, k))
+            rec.content_hash = digest
+            rec.status = 'active'
+            rec.missed = 0
+            rec.last_seen_at = rec.updated_at = now
+            s.add(rec)
+            s.add(_change(kind, rec))
+            (result.new if kind == 'new' else result.changed).append(key)
+
+        for key, rec in stored.items() if jobs else ():
+            if key in seen or rec.status != 'active':
+                continue
+            rec.missed += 1
+            if rec.missed >= settings.POSTINGS_REMOVE_AFTER_MISSES:
+                rec.status = 'removed'
+                rec.updated_at = now
+                s.add(_change('removed', rec))
+                result.removed.append(key)
+            s.add(rec)
+
+        if touched:
+            s.exec(update(PostingRecord).where(PostingRecord.id.in_(touched)).values(last_seen_at=now))
+        s.commit()
+    return result
+
+
+def _plain(content: str) -> str:
+    # Greenhouse returns the description as escaped HTML.
+    text = _TAGS.sub(' ', html.unescape(html.unescape(content or '')))
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+async def _describe(rec: PostingRecord) -> Optional[str]:
+    if rec.source == 'greenhouse':
+        from backend.services.connectors.greenhouse import get_job
+
+        return _plain((await get_job(rec.board, rec.posting_id)).get('content', '')) or None
+    return None
+
+
+def scoring_profile_text() -> Optional[str]:
+    """Profile text postings are scored against: POSTINGS_PROFILE_ID or the latest profile."""
+    from backend.services.profiles import load_profile, match_text
+
+    with session() as s:
+        if settings.POSTINGS_PROFILE_ID:
+            record = s.get(ProfileRecord, settings.POSTINGS_PROFILE_ID)
+        else:
+            record = s.exec(select(ProfileRecord).order_by(ProfileRecord.updated_at.desc())).first()
+    return match_text(load_profile(record)) if record is not None else None
+
+
+async def enrich_board(source: str, board: str) -> int:
+    """Fetch missing descriptions and score postings changed since their last
+    enrichment. Returns how many were enriched."""
+    with session() as s:
+        pending = s.exec(
+            select(PostingRecord).where(
+                PostingRecord.source == source,
+                PostingRecord.board == board,
+                PostingRecord.status == 'active',
+                (PostingRecord.enriched_hash == None) | (PostingRecord.enriched_hash != PostingRecord.content_hash),  # noqa: E711
+            )
+        ).all()
+    if not pending:
+        return 0
+    profile_text = scoring_profile_text()
+    sem = asyncio.Semaphore(max(1, settings.POSTINGS_DESCRIPTION_CONCURRENCY))
+
+    async def one(rec: PostingRecord) -> PostingRecord:
+        if not rec.description:
+            async with sem:
+                try:
+                    rec.description = await _describe(rec)
+                except Exception as e:
+                    print(f"Warning: description fetch failed for {rec.id}: {e}")
+        if profile_text:
+            rec.score = score_job(profile_text, f"{rec.title}\n{rec.description or ''}")
+        rec.enriched_hash = rec.content_hash
+        return rec
+
+    done = await asyncio.gather(*(one(r) for r in pending))
+    with session() as s:
+        for rec in done:
+            s.merge(rec)
+        s.commit()
+    return len(done)
+
+
+async def record_board(source: str, board: str, jobs: List[JobPosting], enrich: bool = False) -> Optional[SyncResult]:
+    """Sync a fetched board (and optionally enrich it) without failing the caller."""
+    if not settings.POSTINGS_SYNC_ENABLED:
+        return None
+    # The crawler and a discovery request may sync the same board at once.
+    lock = _board_locks.setdefault(f"{source}:{board}", asyncio.Lock())
+    try:
+        async with lock:
+            result = await asyncio.to_thread(sync_board, source, board, jobs)
+            if enrich:
+                await enrich_board(source, board)
+        return result
+    except Exception as e:
+        print(f"Warning: posting sync failed for {source}:{board}: {e}")
+        return None
+
+
+def changes_since(since: int = 0, limit: int = 500, kinds: Optional[List[str]] = None) -> List[PostingChange]:
+    with session() as s:
+        q = select(PostingChange).where(PostingChange.seq > since)
+        if kinds:
+            q = q.where(PostingChange.kind.in_(kinds))
+        return list(s.exec(q.order_by(PostingChange.seq).limit(limit)).all())
+
+
+def prune_changes() -> None:
+    """Drop change feed entries older than POSTINGS_CHANGE_RETENTION_DAYS (app startup)."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.POSTINGS_CHANGE_RETENTION_DAYS)
+    with session() as s:
+        s.exec(delete(PostingChange).where(PostingChange.created_at < cutoff))
+        s.commit()
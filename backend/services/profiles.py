@@ -0,0 +1,213 @@
+"""Parsed candidate profiles, stored once per CV and reused by id.
+
+A profile is built from extracted CV text by simple rules (email, name,
+headline, skills and summary sections), optionally refined by a single
+LLM pass, and saved as a ``ProfileRecord`` together with the compacted CV
+text. Packet, batch and matching endpoints accept its ``profile_id``
+instead of a new upload. Uploading the same CV again returns the stored
+profile (keyed by the CV's content hash).
+"""
+from __future__ import annotations
+
+import json
+import re
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from backend.app.models.db import ProfileRecord
+from backend.app.schemas.profile import Profile
+from backend.core.db import session
+from backend.core.token_budget import CV_PRIORITIES, compact, context_window, fit_text, reserved_output_tokens, split_sections
+
+_EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+_LOCATION_LABEL = re.compile(r'^(?:location|based in|address|city)\s*[:\-–]\s*(.+)$', re.I)
+_CITY_COUNTRY = re.compile(r"^[A-Z][\w'.-]*(?: [A-Z][\w'.-]*)*, ?[A-Z][\w'.-]*(?: [A-Z][\w'.-]*)*$")
+_SPLIT_ITEMS = re.compile(r'[,;|•·▪●\n]|\s[-–]\s')
+_BULLET = re.compile(r'^[\s\-*•·▪●]+')
+
+# Heading keyword -> profile field it feeds.
+_HEADINGS = {
+    'skills': 'skills', 'technical skills': 'skills', 'core competencies': 'skills',
+    'competencies': 'skills', 'tech stack': 'skills', 'tools': 'skills',
+    'summary': 'summary', 'profile': 'summary', 'professional summary': 'summary',
+    'about me': 'summary', 'about': 'summary',
+    'objective': 'roles', 'career objective': 'roles', 'desired roles': 'roles', 'target roles': 'roles',
+}
+# Every other CV heading, so their text is not taken for the intro block.
+_OTHER_HEADINGS = {h: 0 for h in CV_PRIORITIES if h not in _HEADINGS}
+
+MAX_SKILLS = 50
+MAX_SUMMARY_CHARS = 600
+
+PROFILE_SYSTEM = """You extract a structured candidate profile from CV text.
+Reply with a single JSON object and nothing else, with the keys:
+full_name, email, location, desired_roles (list), skills (list), summary.
+Use null or [] when the CV does not say. Do not invent facts."""
+
+
+def _body(text: str) -> List[str]:
+    """Lines of a section without its heading line."""
+    return [line for line in text.splitlines()[1:] if line.strip()]
+
+
+def _items(lines: List[str]) -> List[str]:
+    out: Dict[str, str] = {}
+    for line in lines:
+        # 'Languages: Python, Go' -> 'Python, Go'
+        line = line.split(':', 1)[1] if ':' in line and len(line.split(':', 1)[0]) < 30 else line
+        for item in _SPLIT_ITEMS.split(line):
+            item = _BULLET.sub('', item).strip(' .')
+            if 1 < len(item) <= 40 and len(item.split()) <= 5:
+                out.setdefault(item.lower(), item)
+    return list(out.values())[:MAX_SKILLS]
+
+
+def _looks_like_name(line: str) -> bool:
+    words = line.split()
+    return 2 <= len(words) <= 4 and all(w[0].isupper() and w.replace('-', '').replace("'", '').isalpha() for w in words)
+
+
+def extract_profile(text: str) -> Profile:
+    """Rule-based profile from CV text; cheap and deterministic."""
+    text = compact(text)
+    sections = split_sections(text, {**{h: 1 for h in _HEADINGS}, **_OTHER_HEADINGS}, default=0)
+    fields: Dict[str, List[str]] = {'skills': [], 'summary': [], 'roles': []}
+    intro: List[str] = []
+    for s in sections:
+        if s.title == 'intro':
+            intro = [line.strip() for line in s.text.splitlines() if line.strip()]
+        elif s.title in _HEADINGS:
+            fields[_HEADINGS[s.title]] += _body(s.text)
+
+    email = _EMAIL.search(text)
+    full_name = intro[0] if intro and _looks_like_name(intro[0]) else None
+
+    location = None
+    for line in intro[:8]:
+        for part in re.split(r'\s*[|·•]\s*', line):
+            m = _LOCATION_LABEL.match(part)
+            if m or _CITY_COUNTRY.match(part):
+                location = (m.group(1) if m else part).strip()
+                break
+        if location:
+            break
+
+    roles = _items(fields['roles'])
+    if not roles:
+        # The headline under the name ('Senior Backend Engineer') is the best guess.
+        for line in intro[1 if full_name else 0:4]:
+            if len(line) <= 60 and not _EMAIL.search(line) and not any(c.isdigit() for c in line) and line != location:
+                roles = [line]
+                break
+
+    summary = ' '.join(fields['summary']).strip()[:MAX_SUMMARY_CHARS] or None
+    return Profile(
+        full_name=full_name,
+        email=email.group(0) if email else None,
+        location=location,
+        desired_roles=roles,
+        skills=_items(fields['skills']),
+        summary=summary,
+    )
+
+
+def _parse_json(reply: str) -> Dict[str, Any]:
+    start, end = reply.find('{'), reply.rfind('}')
+    if start < 0 or end <= start:
+        raise ValueError('LLM reply has no JSON object')
+    return json.loads(reply[start:end + 1])
+
+
+async def refine_profile(provider: str, text: str, base: Profile) -> Profile:
+    """One LLM pass over the CV; its non-empty fields override ``base``."""
+    from backend.core.router import router
+
+    p = router.provider(provider)
+    budget = max(256, context_window(p.name, p.model) - reserved_output_tokens(p.params) - 512)
+    cv = fit_text(text, budget, p.model, CV_PRIORITIES, default=8, label='cv')
+    reply = await router.chat(provider, system=PROFILE_SYSTEM, user=f"CV:\n---\n{cv.text}\n---")
+    data = _parse_json(reply)
+    merged = base.model_dump()
+    for k, v in Profile.model_validate(data).model_dump().items():
+        if v:
+            merged[k] = v[:MAX_SKILLS] if k == 'skills' else v
+    return Profile(**merged)
+
+
+def match_text(profile: Profile) -> str:
+    """The part of a profile that job matching scores against."""
+    return '\n'.join([*profile.desired_roles, ', '.join(profile.skills), profile.summary or ''])
+
+
+def profile_view(record: ProfileRecord) -> Dict[str, Any]:
+    data = record.model_dump(mode='json', exclude={'text', 'data'})
+    data['profile'] = json.loads(record.data)
+    data['text_chars'] = len(record.text)
+    return data
+
+
+def get_profile(profile_id: str) -> Optional[ProfileRecord]:
+    with session() as s:
+        return s.get(ProfileRecord, profile_id)
+
+
+def load_profile(record: ProfileRecord) -> Profile:
+    return Profile.model_validate_json(record.data)
+
+
+async def create_profile(cv_key: str, text: str, provider: str | None = None, use_llm: bool = False) -> ProfileRecord:
+    """Build and store the profile for a CV, or return the stored one.
+
+    ``cv_key`` is the CV's content hash. An existing rule-based profile is
+    upgraded in place when an LLM pass is asked for.
+    """
+    with session() as s:
+        record = s.exec(select(ProfileRecord).where(ProfileRecord.cv_key == cv_key)).first()
+    if record is not None and (not use_llm or record.source == 'llm'):
+        return record
+
+    text = compact(text)
+    profile, source, error = extract_profile(text), 'rules', None
+    if use_llm:
+        try:
+            profile, source = await refine_profile(provider, text, profile), 'llm'
+        except Exception as e:
+            error = f"LLM profile pass failed, kept rule-based profile: {e}"
+
+    try:
+        return _store(cv_key, text, profile, source, provider, error)
+    except IntegrityError:
+        # A concurrent upload of the same CV inserted its row first.
+        return _store(cv_key, text, profile, source, provider, error)
+
+
+def _store(cv_key: str, text: str, profile: Profile, source: str, provider: str | None, error: str | None) -> ProfileRecord:
+    with session() as s:
+        record = s.exec(select(ProfileRecord).where(ProfileRecord.cv_key == cv_key)).first()
+        if record is None:
+            record = ProfileRecord(id=uuid.uuid4().hex, cv_key=cv_key, text=text, data='{}')
+        elif record.source == 'llm' and source != 'llm':
+            return record  # never downgrade a profile a concurrent LLM pass stored
+        record.data = profile.model_dump_json()
+        record.source = source
+        record.provider = provider if source == 'llm' else None
+        record.error = error
+        record.updated_at = datetime.utcnow()
+        s.add(record)
+        s.commit()
+        s.refresh(record)
+        return record
+
+
+def delete_profile(profile_id: str) -> bool:
+    with session() as s:
+        record = s.get(ProfileRecord, profile_id)
+        if record is None:
+            return False
+        s.delete(record)
+        s.commit()
+        return True
@@ -0,0 +1,44 @@
+"""Importing the app must stay cheap: no document parsers, browser stack or
+provider modules until they are used (cold starts on scale-to-zero hosts
+and every spawned CV parse worker pay for it)."""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BUDGET_SECONDS = float(os.environ.get('JOBCRAFT_IMPORT_BUDGET_SECONDS', '2.5'))
+
+DEFERRED = (
+    'fitz', 'docx', 'playwright', 'playwright_stealth',
+    'backend.providers.ollabridge', 'backend.providers.ollama', 'backend.providers.openai_provider',
+    'backend.providers.anthropic', 'backend.providers.gemini', 'backend.providers.watsonx',
+)
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {list(DEFERRED)!r} if m in sys.modules]}}))
+"""
+
+
+def _import_in_fresh_interpreter() -> dict:
+    env = {**os.environ, 'PYTHONPATH': str(ROOT), 'PYTHONDONTWRITEBYTECODE': '1'}
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_defers_heavy_modules():
+    result = _import_in_fresh_interpreter()
+    assert result['loaded'] == []
+
+
+def test_import_time_budget():
+    # Best of three, so one slow run on a busy CI machine does not fail the build.
+    seconds = min(_import_in_fresh_interpreter()['seconds'] for _ in range(3))
+    assert seconds < BUDGET_SECONDS, f"import backend.main took {seconds:.2f}s (budget {BUDGET_SECONDS}s)"
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.services.locations import country_codes, resolve_location
+
+
+@pytest.mark.parametrize(
+    ('location', 'countries'),
+    [
+        ('Berlin, DE', ('DE',)),
+        ('Wilmington, DE', ('US',)),
+        ('Remote - DE', ('DE',)),
+        ('Austin, TX', ('US',)),
+        ('London, Ontario', ('CA',)),
+        ('London; Toronto, ON', ('GB', 'CA')),
+        ('Toronto, CA', ('CA',)),
+        ('Remote US', ('US',)),
+        ('US-Remote', ('US',)),
+        ('Remote-US', ('US',)),
+        ('UK-Remote', ('GB',)),
+        ('Dublin, CA', ('US',)),
+        ('Valencia, CA', ('US',)),
+        ('Perth, WA', ('AU',)),
+        ('Seattle, WA', ('US',)),
+        ('Baden-Württemberg', ('DE',)),
+        ('Stuttgart, Baden-Württemberg', ('DE',)),
+        ('Tbilisi, Georgia', ('GE',)),
+        ('Georgia - Tbilisi', ('GE',)),
+        ('Atlanta, Georgia', ('US',)),
+        ('Savannah, Georgia', ('US',)),
+        ('CITY', ()),
+        ('Remote - EMEA', ()),
+    ],
+)
+def test_resolve_location(location: str, countries: tuple):
+    assert resolve_location(location).countries == countries
+
+
+def test_remote_flag():
+    assert resolve_location('Remote - DE').remote
+    assert not resolve_location('Berlin, DE').remote
+    assert not resolve_location('Not remote, Berlin').remote
+
+
+def test_country_codes_prefer_the_country():
+    assert country_codes(['DE', 'UK', 'Georgia', 'Germany']) == ['DE', 'GB', 'GE']